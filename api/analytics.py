@@ -0,0 +1,115 @@
+"""
+Grade analytics for the COM569 Assignment Grading System
+
+The analytics endpoints fetch the graded scores of an assignment or a whole
+class in one query and hand them here as flat arrays: one group key (an
+assignment or rubric criterion id) and one value per row. summarize() sorts
+the rows once by (group, value) and derives every statistic for every group
+from that order with NumPy reductions, so the cost is a sort of the scores no
+matter how many assignments or criteria there are.
+
+Standard deviations are population ones (every graded submission is in the
+data, not a sample). Percentiles interpolate linearly between the two nearest
+scores, as numpy.percentile does by default. Histograms bucket scores by
+percentage of max points into HISTOGRAM_BINS equal bins; scores above max
+points (extra credit) count in the top bin.
+"""
+
+import numpy as np
+
+PERCENTILES = (10, 25, 50, 75, 90)
+HISTOGRAM_BINS = 10
+HISTOGRAM_EDGES = np.linspace(0, 100, HISTOGRAM_BINS + 1).tolist()
+
+
+def _rounded(values):
+    """Plain floats (None for NaN) rounded for JSON."""
+    return [None if np.isnan(value) else round(value, 2) for value in values.tolist()]
+
+
+def _percentile(sorted_values, starts, counts, q):
+    # Linear interpolation between the two scores around rank q% in each group
+    rank = (counts - 1) * (q / 100)
+    lower = np.floor(rank).astype(np.intp)
+    upper = np.minimum(lower + 1, counts - 1)
+    fraction = rank - lower
+    low = sorted_values[starts + lower]
+    return low + (sorted_values[starts + upper] - low) * fraction
+
+
+def summarize(groups, values, max_points=None):
+    """
+    Per-group statistics of values. groups and values are equal-length
+    sequences; max_points maps a group key to its maximum score and adds the
+    mean as a percentage and a histogram. Returns {group key: summary dict}
+    for every key that occurs in groups.
+    """
+    groups = np.asarray(groups)
+    values = np.asarray(values, dtype=float)
+    if not len(values):
+        return {}
+
+    keys, inverse, counts = np.unique(groups, return_inverse=True, return_counts=True)
+    order = np.lexsort((values, inverse))
+    sorted_values = values[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    means = np.add.reduceat(sorted_values, starts) / counts
+    deviations = sorted_values - np.repeat(means, counts)
+    stds = np.sqrt(np.add.reduceat(deviations * deviations, starts) / counts)
+    columns = {
+        'mean': means,
+        'median': _percentile(sorted_values, starts, counts, 50),
+        'std': stds,
+        'min': sorted_values[starts],
+        'max': sorted_values[starts + counts - 1],
+    }
+    columns = {name: _rounded(column) for name, column in columns.items()}
+    percentiles = {f'p{q}': _rounded(_percentile(sorted_values, starts, counts, q)) for q in PERCENTILES}
+
+    histograms = mean_percents = None
+    if max_points is not None:
+        maxima = np.array([max_points.get(key) or np.nan for key in keys.tolist()], dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_percents = _rounded(means / maxima * 100)
+            percents = values / maxima[inverse] * 100
+        # Groups without a usable max_points land in bin 0 and are reported as None below
+        bins = np.clip(np.nan_to_num(percents, nan=0) // (100 / HISTOGRAM_BINS), 0, HISTOGRAM_BINS - 1)
+        histograms = np.bincount(inverse * HISTOGRAM_BINS + bins.astype(np.intp),
+                                 minlength=len(keys) * HISTOGRAM_BINS).reshape(len(keys), HISTOGRAM_BINS)
+        histograms = [counts_row if not np.isnan(maximum) else None
+                      for counts_row, maximum in zip(histograms.tolist(), maxima.tolist())]
+
+    summaries = {}
+    for i, key in enumerate(keys.tolist()):
+        summary = {'count': int(counts[i])}
+        summary.update((name, column[i]) for name, column in columns.items())
+        summary['percentiles'] = {name: column[i] for name, column in percentiles.items()}
+        if max_points is not None:
+            summary['mean_percent'] = mean_percents[i]
+            summary['histogram'] = histograms[i]
+        summaries[key] = summary
+    return summaries
+
+
+def distribution(values, max_points=None):
+    """summarize() of values as a single group; {'count': 0} when there are none."""
+    values = np.asarray(values, dtype=float)
+    summaries = summarize(np.zeros(len(values), dtype=np.intp), values,
+                          None if max_points is None else {0: max_points})
+    return summaries.get(0, {'count': 0})
+
+
+def totals_by(groups, values):
+    """Sum of values per group key: (keys, totals) arrays."""
+    keys, inverse = np.unique(np.asarray(groups), return_inverse=True)
+    return keys, np.bincount(inverse, weights=np.asarray(values, dtype=float), minlength=len(keys))
+
+
+def score_columns(rows):
+    """Split (assignment_id, student_id, rubric_id, points) rows into NumPy columns."""
+    # Column by column: np.array() on the rows themselves treats each result row as a
+    # generic sequence and is ~100x slower
+    columns = list(zip(*rows)) or [()] * 4
+    ids = [np.fromiter(column, dtype=np.int64, count=len(rows)) for column in columns[:3]]
+    return ids[0], ids[1], ids[2], np.fromiter(columns[3], dtype=float, count=len(rows))
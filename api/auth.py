@@ -0,0 +1,93 @@
+"""
+Access tokens and the principal cache for the COM569 Assignment Grading System
+
+Login hands out a signed, timestamped token carrying only the user id. Each
+request resolves that id to a principal (role and class memberships) from a
+small in-process LRU cache, so authorizing a request normally costs no query.
+Entries expire after a TTL and are dropped explicitly when the user's
+enrollments or classes change.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+
+
+class InvalidToken(Exception):
+    """Raised for tokens that are malformed, tampered with or expired."""
+
+
+class TokenSigningDisabled(Exception):
+    """Raised when no secret key is configured, so tokens can be neither issued nor checked."""
+
+
+class TokenSigner:
+    def __init__(self, secret_key, max_age):
+        self.max_age = max_age
+        self._serializer = URLSafeTimedSerializer(secret_key, salt='access-token') if secret_key else None
+
+    @property
+    def enabled(self):
+        return self._serializer is not None
+
+    def issue(self, user_id):
+        if not self.enabled:
+            raise TokenSigningDisabled()
+        return self._serializer.dumps({'uid': user_id})
+
+    def user_id(self, token):
+        if not self.enabled:
+            raise TokenSigningDisabled()
+        try:
+            return self._serializer.loads(token, max_age=self.max_age)['uid']
+        except (BadSignature, SignatureExpired, KeyError, TypeError):
+            raise InvalidToken()
+
+
+class Principal:
+    __slots__ = ('user_id', 'role', 'class_ids')
+
+    def __init__(self, user_id, role, class_ids):
+        self.user_id = user_id
+        self.role = role
+        self.class_ids = frozenset(class_ids)
+
+
+class PrincipalCache:
+    """Bounded LRU of user_id -> Principal with a per-entry TTL. Thread-safe."""
+
+    def __init__(self, maxsize=10000, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def put(self, principal):
+        with self._lock:
+            self._entries[principal.user_id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(principal.user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
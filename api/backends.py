@@ -0,0 +1,139 @@
+"""
+Database backend helpers for the COM569 Assignment Grading System
+
+The models and queries in app.py are plain SQLAlchemy and run on SQLite (one
+file, one host) or PostgreSQL (DATABASE_URL=postgresql://...). This module
+holds the few places where the backends differ: URL normalisation, bulk
+loading (COPY on PostgreSQL, executemany elsewhere), INSERT ... ON CONFLICT
+and resetting id sequences after rows were loaded with explicit ids. copy_database() moves an
+existing database, e.g. instance/grading_system.db, to another backend in
+batches.
+
+Usage:
+    cd api
+    DATABASE_URL=postgresql://grading@localhost/grading \\
+        flask --app app copy-database sqlite:///instance/grading_system.db
+"""
+
+from sqlalchemy import Integer, insert, inspect, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+COPY_BATCH_SIZE = 5000
+
+
+def normalize_url(url):
+    """
+    Point every PostgreSQL URL at the psycopg 3 driver: postgres:// (as hosting
+    providers hand out), postgresql:// (SQLAlchemy's default is psycopg2) and
+    postgresql+<driver>:// all become postgresql+psycopg://. copy_rows needs
+    psycopg 3's cursor.copy().
+    """
+    scheme, separator, rest = url.partition('://')
+    if separator and scheme.split('+')[0] in ('postgres', 'postgresql'):
+        return 'postgresql+psycopg://' + rest
+    return url
+
+
+def _fill_defaults(table, rows):
+    # COPY bypasses SQLAlchemy, so apply the Python-side column defaults (e.g. created_at) here
+    columns = [c for c in table.columns if any(c.name in row for row in rows)
+               or (c.default is not None and not c.primary_key)]
+    filled = []
+    for row in rows:
+        values = []
+        for column in columns:
+            if column.name in row:
+                values.append(row[column.name])
+            elif column.default is not None and column.default.is_callable:
+                values.append(column.default.arg(None))
+            elif column.default is not None and column.default.is_scalar:
+                values.append(column.default.arg)
+            else:
+                values.append(None)
+        filled.append(values)
+    return [c.name for c in columns], filled
+
+
+def copy_rows(conn, table, rows):
+    """
+    Bulk-insert a list of row dicts into table on an open SQLAlchemy connection,
+    inside the caller's transaction. PostgreSQL streams them with COPY; other
+    backends use a single executemany INSERT.
+    """
+    if not rows:
+        return 0
+    if conn.dialect.name != 'postgresql':
+        conn.execute(insert(table), rows)
+        return len(rows)
+
+    names, values = _fill_defaults(table, rows)
+    quoted = ', '.join(conn.dialect.identifier_preparer.quote(name) for name in names)
+    statement = f"COPY {table.name} ({quoted}) FROM STDIN"
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        # COPY runs on the raw cursor; fire the cursor events by hand so listeners
+        # (query counters, the response cache's write tracking) still see it
+        conn.dispatch.before_cursor_execute(conn, cursor, statement, (), None, False)
+        with cursor.copy(statement) as copy:
+            for row in values:
+                copy.write_row(row)
+        conn.dispatch.after_cursor_execute(conn, cursor, statement, (), None, False)
+    finally:
+        cursor.close()
+    return len(values)
+
+
+def upsert_insert(conn, table):
+    """An INSERT into table for conn's backend, with on_conflict_do_update() and .excluded (SQLite or PostgreSQL)."""
+    if conn.dialect.name == 'postgresql':
+        return postgresql.insert(table)
+    if conn.dialect.name == 'sqlite':
+        return sqlite.insert(table)
+    raise NotImplementedError(f"INSERT ... ON CONFLICT is not supported on {conn.dialect.name}")
+
+
+def reset_sequences(conn, tables):
+    """After loading rows with explicit ids, move each PostgreSQL id sequence past the largest id."""
+    if conn.dialect.name != 'postgresql':
+        return
+    for table in tables:
+        columns = list(table.primary_key.columns)
+        # Only a single-column integer key has a sequence; a String key such as
+        # id_sequences.name reports autoincrement='auto' too
+        if len(columns) != 1 or not isinstance(columns[0].type, Integer) or columns[0].autoincrement not in (True, 'auto'):
+            continue
+        column = columns[0]
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence(:table, :column), "
+            f"COALESCE(MAX({column.name}), 1), MAX({column.name}) IS NOT NULL) FROM {table.name}"
+        ), {'table': table.name, 'column': column.name})
+
+
+def copy_database(source_engine, target_engine, tables, batch_size=COPY_BATCH_SIZE):
+    """
+    Copy every row of tables (parents first) from source_engine to target_engine,
+    keeping the ids. The source is read through a streaming cursor and written in
+    batches of batch_size, one transaction per batch. Only columns present on both
+    sides are copied. Returns {table name: rows copied}.
+    """
+    source_tables = set(inspect(source_engine).get_table_names())
+    copied = {}
+
+    with source_engine.connect() as source:
+        for table in tables:
+            if table.name not in source_tables:
+                continue
+            source_columns = {c['name'] for c in inspect(source_engine).get_columns(table.name)}
+            columns = [c for c in table.columns if c.name in source_columns]
+            query = select(*columns).order_by(*table.primary_key.columns)
+            result = source.execution_options(stream_results=True, max_row_buffer=batch_size).execute(query)
+
+            copied[table.name] = 0
+            for batch in result.mappings().partitions(batch_size):
+                with target_engine.begin() as target:
+                    copied[table.name] += copy_rows(target, table, [dict(row) for row in batch])
+
+    with target_engine.begin() as target:
+        reset_sequences(target, tables)
+
+    return copied
@@ -0,0 +1 @@
+"""Benchmarks for the COM569 Assignment Grading System API."""
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+HTTP load test for the main API scenarios
+
+Generates a synthetic database (benchmarks.synthetic) or reuses one, serves
+app.py from a separate process (werkzeug's threaded server with keep-alive)
+and drives it over HTTP with --concurrency client threads, each on its own
+connection, for --seconds per scenario after --warmup seconds:
+
+    login_storm        POST /api/auth/login as random students (bound by password hashing)
+    submission_burst   POST /api/submissions for the nearest deadlines, as the students
+    gradebook_reads    student grades and dashboards, grading queues and class rosters
+    csv_export         assignment grade exports and class gradebooks with criteria columns
+
+Requests carry bearer tokens (AUTH_REQUIRED is on) and accept gzip, as the
+portals do. The report is JSON: for each scenario the throughput, errors and
+p50/p95/p99 latency overall and per endpoint, with the SQL statements each
+endpoint ran per request (counted in the server process). --baseline prints
+the changes against an earlier report, for tracking regressions between
+versions.
+
+Usage:
+    cd api
+    python -m benchmarks.load --students 2000 --classes 80 --submissions 20000 --seconds 5
+    DATABASE_URL=sqlite:////tmp/bench.db python -m benchmarks.synthetic --students 50000 --classes 2000 --submissions 500000
+    python -m benchmarks.load --database-url sqlite:////tmp/bench.db --output after.json --baseline before.json
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import DateTime, bindparam, text
+
+from benchmarks.payloads import WORDS
+from benchmarks.synthetic import PASSWORD, add_scale_arguments, scale_options, generate
+
+STATS_PATH = '/__bench__/stats'
+TABLES = ('users', 'classes', 'enrollments', 'assignments', 'rubrics', 'submissions', 'grades', 'overall_grades')
+
+
+# Each scenario returns the next request as (method, route rule, path, JSON body, user id to
+# authenticate as), or None when it has run out of work. The route rule matches the server's
+# url_rule, so client timings and server query counts line up per endpoint.
+
+def login_storm(rng, fixtures):
+    email = rng.choice(fixtures['student_emails'])
+    return 'POST', '/api/auth/login', '/api/auth/login', {'email': email, 'password': PASSWORD}, None
+
+
+def submission_burst(rng, fixtures):
+    try:
+        assignment_id, student_id = fixtures['open_pairs'].popleft()
+    except IndexError:
+        return None
+    body = {'assignment_id': assignment_id, 'student_id': student_id,
+            'submission_text': ' '.join(rng.choices(WORDS, k=300))}
+    return 'POST', '/api/submissions', '/api/submissions', body, student_id
+
+
+def gradebook_reads(rng, fixtures):
+    student_id = rng.choice(fixtures['student_ids'])
+    class_id, instructor_id = rng.choice(fixtures['classes'])
+    pick = rng.random()
+    if pick < 0.35:
+        return ('GET', '/api/grades/student/<int:student_id>', f'/api/grades/student/{student_id}', None,
+                student_id)
+    if pick < 0.7:
+        return ('GET', '/api/students/<int:student_id>/dashboard', f'/api/students/{student_id}/dashboard', None,
+                student_id)
+    if pick < 0.85:
+        return ('GET', '/api/grading-queue', f'/api/grading-queue?instructor_id={instructor_id}', None,
+                instructor_id)
+    return 'GET', '/api/classes/<int:class_id>/students', f'/api/classes/{class_id}/students', None, instructor_id
+
+
+def csv_export(rng, fixtures):
+    assignment_id, class_id, instructor_id = rng.choice(fixtures['past_assignments'])
+    if rng.random() < 0.5:
+        return ('GET', '/api/grades/export/<int:assignment_id>', f'/api/grades/export/{assignment_id}', None,
+                instructor_id)
+    return ('GET', '/api/grades/export/class/<int:class_id>', f'/api/grades/export/class/{class_id}?criteria=1',
+            None, instructor_id)
+
+
+SCENARIOS = {
+    'login_storm': login_storm,
+    'submission_burst': submission_burst,
+    'gradebook_reads': gradebook_reads,
+    'csv_export': csv_export,
+}
+
+
+def serve(port):
+    """Server mode: app.py on werkzeug's threaded server, counting SQL statements per route."""
+    import logging
+    from flask import jsonify, request, has_request_context
+    from sqlalchemy import event
+    from werkzeug.serving import make_server, WSGIRequestHandler
+    from app import app, db
+
+    counts = {}
+    lock = threading.Lock()
+
+    def route():
+        if request.url_rule is None or request.endpoint == 'bench_stats':
+            return None
+        return f"{request.method} {request.url_rule.rule}"
+
+    @app.before_request
+    def count_request():
+        key = route()
+        if key:
+            with lock:
+                counts.setdefault(key, {'requests': 0, 'queries': 0})['requests'] += 1
+
+    def count_query(*args):
+        # Streamed responses (CSV exports) still run inside their request context
+        key = route() if has_request_context() else None
+        if key:
+            with lock:
+                counts.setdefault(key, {'requests': 0, 'queries': 0})['queries'] += 1
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', count_query)
+    app.add_url_rule(STATS_PATH, 'bench_stats', lambda: jsonify(counts))
+
+    class Handler(WSGIRequestHandler):
+        # Keep-alive, as behind any production server
+        protocol_version = 'HTTP/1.1'
+
+        def log_request(self, *args):
+            pass
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    make_server('127.0.0.1', port, app, threaded=True, request_handler=Handler).serve_forever()
+
+
+class Client:
+    """One keep-alive HTTP connection to the server under test."""
+
+    def __init__(self, port, tokens, accept_encoding='gzip'):
+        self.port = port
+        self.tokens = tokens
+        self.accept_encoding = accept_encoding
+        self.conn = None
+
+    def send(self, method, path, body=None, user_id=None):
+        """(status, milliseconds, body bytes); status 0 when the connection failed."""
+        headers = {'Accept-Encoding': self.accept_encoding} if self.accept_encoding else {}
+        if user_id is not None:
+            headers['Authorization'] = f'Bearer {self.tokens(user_id)}'
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        start = time.perf_counter()
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=120)
+            self.conn.request(method, path, body, headers)
+            response = self.conn.getresponse()
+            data = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = None
+            return 0, (time.perf_counter() - start) * 1000, b''
+        return status, (time.perf_counter() - start) * 1000, data
+
+
+def run_scenario(port, tokens, scenario, fixtures, concurrency, seconds, seed_value):
+    """Drive scenario from concurrency threads for seconds: ([(endpoint, status, ms)], elapsed seconds)."""
+    results = []
+    deadline = time.monotonic() + seconds
+
+    def worker(n):
+        rng = random.Random(seed_value * 1000 + n)
+        client = Client(port, tokens)
+        timings = []
+        while time.monotonic() < deadline:
+            request = scenario(rng, fixtures)
+            if request is None:
+                break
+            method, rule, path, body, user_id = request
+            status, elapsed, _ = client.send(method, path, body, user_id)
+            timings.append((f'{method} {rule}', status, elapsed))
+        results.extend(timings)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start
+
+
+def latency_summary(timings):
+    timings = sorted(timings)
+    if not timings:
+        return {}
+
+    def at(q):
+        return round(timings[min(len(timings) - 1, int(len(timings) * q))], 2)
+
+    return {'p50': at(0.5), 'p95': at(0.95), 'p99': at(0.99), 'max': round(timings[-1], 2),
+            'mean': round(statistics.fmean(timings), 2)}
+
+
+def summarize(results, elapsed, before, after):
+    """Scenario report from client results and the server's query counts before and after it."""
+    endpoints = {}
+    for key in sorted({key for key, _, _ in results}):
+        rows = [(status, ms) for k, status, ms in results if k == key]
+        served = after.get(key, {}).get('requests', 0) - before.get(key, {}).get('requests', 0)
+        queries = after.get(key, {}).get('queries', 0) - before.get(key, {}).get('queries', 0)
+        endpoints[key] = {
+            'requests': len(rows),
+            'errors': sum(1 for status, _ in rows if not 200 <= status < 300),
+            'throughput_rps': round(len(rows) / elapsed, 1),
+            'latency_ms': latency_summary([ms for _, ms in rows]),
+            'queries_per_request': round(queries / served, 2) if served else None,
+        }
+    statuses = {}
+    for _, status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        'requests': len(results),
+        'errors': sum(1 for _, status, _ in results if not 200 <= status < 300),
+        'statuses': statuses,
+        'seconds': round(elapsed, 2),
+        'throughput_rps': round(len(results) / elapsed, 1) if elapsed else 0.0,
+        'latency_ms': latency_summary([ms for _, _, ms in results]),
+        'endpoints': endpoints,
+    }
+
+
+def load_fixtures(engine, open_pairs):
+    """Ids the scenarios pick from, read straight from the database, and the row count per table."""
+    now = bindparam('now', datetime.utcnow(), type_=DateTime())
+    with engine.connect() as conn:
+        students = conn.execute(text(
+            "SELECT user_id, email FROM users WHERE role = 'student' ORDER BY user_id")).all()
+        classes = conn.execute(text("SELECT class_id, instructor_id FROM classes ORDER BY class_id")).all()
+        past = conn.execute(text(
+            "SELECT a.assignment_id, a.class_id, c.instructor_id FROM assignments a "
+            "JOIN classes c ON c.class_id = a.class_id WHERE a.due_date < :now ORDER BY a.assignment_id"
+        ).bindparams(now)).all()
+        # Students who haven't submitted yet, nearest deadline first: everyone piles onto the same assignments
+        pairs = conn.execute(text(
+            "SELECT a.assignment_id, e.student_id FROM assignments a "
+            "JOIN enrollments e ON e.class_id = a.class_id "
+            "WHERE a.due_date > :now AND NOT EXISTS (SELECT 1 FROM submissions s "
+            "WHERE s.assignment_id = a.assignment_id AND s.student_id = e.student_id) "
+            "ORDER BY a.due_date, a.assignment_id, e.student_id LIMIT :limit"
+        ).bindparams(now), {'limit': open_pairs}).all()
+        scale = {table: conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar() for table in TABLES}
+    if not students or not past:
+        raise SystemExit('The database has no students or no past-due assignments to test with')
+    return {
+        'student_ids': [row.user_id for row in students],
+        'student_emails': [row.email for row in students],
+        'classes': [tuple(row) for row in classes],
+        'past_assignments': [tuple(row) for row in past],
+        'open_pairs': deque(tuple(row) for row in pairs),
+    }, scale
+
+
+def git_version():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def change(old, new):
+    if old in (None, 0) or new is None:
+        return ''
+    return f"{(new - old) / old * 100:+.0f}%"
+
+
+def compare(report, baseline, out):
+    """Print throughput, p95 and queries per request next to a baseline report's."""
+    print(f"\nvs {baseline.get('label') or baseline.get('version') or 'baseline'}", file=out)
+    print(f"{'scenario / endpoint':<56}{'rps':>18}{'p95 ms':>20}{'queries':>18}", file=out)
+    for name, scenario in report['scenarios'].items():
+        old = baseline.get('scenarios', {}).get(name)
+        if old is None:
+            continue
+        rows = [(name, scenario, old)]
+        rows += [(f"  {key}", endpoint, old['endpoints'].get(key, {}))
+                 for key, endpoint in scenario['endpoints'].items()]
+        for label, new_row, old_row in rows:
+            old_rps, new_rps = old_row.get('throughput_rps'), new_row['throughput_rps']
+            old_p95, new_p95 = old_row.get('latency_ms', {}).get('p95'), new_row['latency_ms'].get('p95')
+            queries = ''
+            if 'queries_per_request' in new_row:
+                queries = f"{old_row.get('queries_per_request')} → {new_row['queries_per_request']}"
+            print(f"{label:<56}{f'{new_rps} {change(old_rps, new_rps)}':>18}"
+                  f"{f'{new_p95} {change(old_p95, new_p95)}':>20}{queries:>18}", file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_scale_arguments(parser)
+    parser.add_argument('--database-url', default=None,
+                        help='test against this database (generated first if it has no users) instead of a fresh one')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma-separated scenarios to run')
+    parser.add_argument('--concurrency', type=int, default=16, help='client threads')
+    parser.add_argument('--seconds', type=float, default=10, help='measured length of each scenario')
+    parser.add_argument('--warmup', type=float, default=1, help='unmeasured run before each scenario')
+    parser.add_argument('--label', default=None, help='name for this run in the report')
+    parser.add_argument('--output', default=None, help='write the JSON report here instead of stdout')
+    parser.add_argument('--baseline', default=None, help='earlier JSON report to compare against')
+    parser.add_argument('--serve', type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+
+    workdir = tempfile.mkdtemp(prefix='grading_load_')
+    os.environ.update(
+        DATABASE_URL=args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        SECRET_KEY='bench-secret', AUTH_REQUIRED='True',
+        RESPONSE_CACHE_PATH=os.path.join(workdir, 'response_cache.db'),
+        EVENT_LOG_PATH=os.path.join(workdir, 'events.db'),
+        JOB_ARTIFACT_PATH=os.path.join(workdir, 'job_artifacts'),
+    )
+    from app import app, db, upgrade_database, password_hasher, token_signer, User
+
+    log = sys.stderr
+    with app.app_context():
+        db.create_all()
+        upgrade_database(db.engine)
+        if db.session.query(User.user_id).first() is None:
+            print(f"Generating {args.students} students, {args.classes} classes, ~{args.submissions} submissions",
+                  file=log)
+            start = time.perf_counter()
+            with db.engine.begin() as conn:
+                generate(conn, db.metadata.tables, password_hasher.hash(PASSWORD), **scale_options(args))
+            print(f"   done in {time.perf_counter() - start:.1f}s", file=log)
+        db.session.remove()
+        dialect = db.engine.dialect.name
+        # Enough unsubmitted work for the burst at a generous rate
+        fixtures, scale = load_fixtures(db.engine, int(2000 * (args.seconds + args.warmup)))
+
+    tokens = {}
+
+    def token(user_id):
+        if user_id not in tokens:
+            tokens[user_id] = token_signer.issue(user_id)
+        return tokens[user_id]
+
+    port = free_port()
+    # Its own process group, so stopping it also stops its password hashing workers (which would
+    # otherwise outlive it and hold our stdout open)
+    server = subprocess.Popen([sys.executable, '-m', 'benchmarks.load', '--serve', str(port)],
+                              start_new_session=True)
+    try:
+        stats_client = Client(port, token, accept_encoding=None)
+        stats_user = fixtures['classes'][0][1]
+        for _ in range(300):
+            if stats_client.send('GET', '/api/health')[0] == 200:
+                break
+            time.sleep(0.1)
+        else:
+            raise SystemExit('The server did not start')
+
+        def server_counts():
+            status, _, body = stats_client.send('GET', STATS_PATH, user_id=stats_user)
+            return json.loads(body) if status == 200 else {}
+
+        report = {
+            'label': args.label,
+            'version': git_version(),
+            'started_at': datetime.utcnow().isoformat(timespec='seconds'),
+            'database': dialect,
+            'scale': scale,
+            'concurrency': args.concurrency,
+            'seconds': args.seconds,
+            'scenarios': {},
+        }
+        for name in scenarios:
+            print(f"{name}: {args.warmup:g}s warmup, {args.seconds:g}s x {args.concurrency} clients", file=log)
+            if args.warmup:
+                run_scenario(port, token, SCENARIOS[name], fixtures, args.concurrency, args.warmup, args.seed)
+            before = server_counts()
+            results, elapsed = run_scenario(port, token, SCENARIOS[name], fixtures, args.concurrency,
+                                            args.seconds, args.seed + 1)
+            summary = summarize(results, elapsed, before, server_counts())
+            report['scenarios'][name] = summary
+            latency = summary['latency_ms']
+            print(f"   {summary['requests']} requests, {summary['throughput_rps']} req/s, "
+                  f"p50 {latency.get('p50')} ms, p95 {latency.get('p95')} ms, p99 {latency.get('p99')} ms, "
+                  f"{summary['errors']} errors", file=log)
+    finally:
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f"✅ Report written to {args.output}", file=log)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f), log)
+
+
+if __name__ == '__main__':
+    main()
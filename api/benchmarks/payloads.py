@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Serialization and wire-size benchmark for the largest API responses
+
+Builds a throwaway database with the synthetic cohort from query_plans (plus
+essay-length submission texts), captures the payload each endpoint hands to
+jsonify, then reports the median time to serialize it with the stdlib and
+orjson providers and the bytes on the wire uncompressed, gzipped and (when the
+brotli package is installed) brotli-encoded. The response cache is turned off
+so every request reaches the serializer.
+
+Usage:
+    cd api
+    python -m benchmarks.payloads --students 2000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+WORDS = ('the', 'rubric', 'student', 'analysis', 'software', 'requirements', 'testing', 'design',
+         'agile', 'sprint', 'stakeholder', 'risk', 'quality', 'process', 'model', 'evaluation',
+         'project', 'management', 'because', 'therefore', 'however', 'system', 'user', 'data')
+
+
+def median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=2000, help='number of synthetic students')
+    parser.add_argument('--words', type=int, default=300, help='words per submission text')
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per endpoint and provider')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='grading_payloads_')
+    os.environ.update(DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+                      RESPONSE_CACHE='off', HASH_WORKERS='0', AUTH_REQUIRED='False')
+
+    from app import app, db, upgrade_database
+    from benchmarks.query_plans import seed
+    from serialization import StdlibJSONProvider, OrJSONProvider, orjson, brotli, compress
+
+    rng = random.Random(569)
+    with app.app_context():
+        db.create_all()
+        upgrade_database(db.engine)
+        with db.engine.begin() as conn:
+            params = seed(conn, args.students)
+            ids = [row[0] for row in conn.exec_driver_sql("SELECT submission_id FROM submissions")]
+            conn.exec_driver_sql(
+                "UPDATE submissions SET submission_text = ? WHERE submission_id = ?",
+                [(' '.join(rng.choices(WORDS, k=args.words)), i) for i in ids]
+            )
+
+    endpoints = [
+        ('submissions page', '/api/submissions?limit=500'),
+        ('assignment submissions', f"/api/submissions?assignment_id={params['assignment_id']}"),
+        ('student grades', f"/api/grades/student/{params['student_id']}"),
+        ('student dashboard', f"/api/students/{params['student_id']}/dashboard"),
+        ('grading queue', f"/api/grading-queue?instructor_id={params['instructor_id']}"),
+    ]
+    providers = [('stdlib', StdlibJSONProvider(app))]
+    if orjson is not None:
+        providers.append(('orjson', OrJSONProvider(app)))
+    encodings = ['gzip'] + (['br'] if brotli else [])
+
+    captured = []
+
+    class Capture(StdlibJSONProvider):
+        def response(self, *args, **kwargs):
+            captured.append(self._prepare_response_obj(args, kwargs))
+            return super().response(*args, **kwargs)
+
+    app.json = Capture(app)
+    client = app.test_client()
+
+    print(f"{args.students} students, {args.words}-word submissions, median of {args.repeat} runs\n")
+    print(f"{'endpoint':<24}" + ''.join(f"{name + ' ms':>11}" for name, _ in providers)
+          + f"{'bytes':>10}" + ''.join(f"{e + ' bytes':>12}{e + ' ms':>9}" for e in encodings))
+    for name, url in endpoints:
+        captured.clear()
+        client.get(url)
+        payload = captured[-1]
+
+        with app.app_context():
+            line = f"{name:<24}"
+            for _, provider in providers:
+                line += f"{median_ms(lambda: provider.response(payload).get_data(), args.repeat):>11.2f}"
+            body = providers[-1][1].response(payload).get_data()
+            line += f"{len(body):>10,}"
+            for encoding in encodings:
+                line += f"{len(compress(body, encoding)):>12,}"
+                line += f"{median_ms(lambda: compress(body, encoding), args.repeat):>9.2f}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
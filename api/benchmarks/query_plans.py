@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Query plan benchmark for the hot lookup indexes
+
+Builds a throwaway database with the real schema (create_all + migrations),
+fills it with synthetic data, then for each query shape the API runs on a hot
+path prints the SQLite query plan and the median lookup time with and without
+the migration-managed indexes.
+
+Usage:
+    cd api
+    python -m benchmarks.query_plans --students 5000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# (name, SQL, index the plan should use) - shapes taken from the endpoints in app.py
+HOT_QUERIES = [
+    ('student gradebook',
+     "SELECT * FROM submissions WHERE student_id = :student_id AND status = 'graded'",
+     'ix_submissions_student_status'),
+    ('gradebook rubric grades',
+     "SELECT g.* FROM grades g JOIN submissions s ON s.submission_id = g.submission_id "
+     "WHERE s.student_id = :student_id AND s.status = 'graded'",
+     'ix_submissions_student_status'),
+    ('assignment export',
+     "SELECT * FROM submissions WHERE assignment_id = :assignment_id AND status = 'graded'",
+     'ix_submissions_assignment_status'),
+    ('already submitted?',
+     "SELECT * FROM submissions WHERE assignment_id = :assignment_id AND student_id = :student_id",
+     'ix_submissions_'),
+    ('class roster',
+     "SELECT * FROM enrollments WHERE class_id = :class_id",
+     'ix_enrollments_class_student'),
+    ('already enrolled?',
+     "SELECT * FROM enrollments WHERE class_id = :class_id AND student_id = :student_id",
+     'ix_enrollments_class_student'),
+    ('student classes',
+     "SELECT * FROM enrollments WHERE student_id = :student_id",
+     'ix_enrollments_student'),
+    ('class assignments',
+     "SELECT * FROM assignments WHERE class_id = :class_id ORDER BY due_date",
+     'ix_assignments_class_due'),
+    ('instructor assignments',
+     "SELECT * FROM assignments WHERE instructor_id = :instructor_id",
+     'ix_assignments_instructor'),
+    ('instructor classes',
+     "SELECT * FROM classes WHERE instructor_id = :instructor_id",
+     'ix_classes_instructor'),
+    ('assignment rubrics',
+     "SELECT * FROM rubrics WHERE assignment_id = :assignment_id",
+     'ix_rubrics_assignment'),
+    ('submission grades',
+     "SELECT * FROM grades WHERE submission_id = :submission_id",
+     'uq_grades_submission_rubric'),
+]
+
+
+def seed(conn, students, seed_value=569):
+    """Fill the schema with a deterministic synthetic cohort."""
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    instructors = max(1, students // 100)
+    classes = max(1, students // 50)
+
+    conn.exec_driver_sql(
+        "INSERT INTO users (user_id, unique_id, email, password_hash, first_name, last_name, role, created_at) "
+        "VALUES (?, ?, ?, 'x', ?, ?, ?, ?)",
+        [(i, f"i{i:05d}", f"i{i}@bench", 'Inst', str(i), 'instructor', now) for i in range(1, instructors + 1)]
+        + [(instructors + i, f"s{i:08d}", f"s{i}@bench", 'Stud', str(i), 'student', now)
+           for i in range(1, students + 1)]
+    )
+    class_instructor = {c: rng.randint(1, instructors) for c in range(1, classes + 1)}
+    conn.exec_driver_sql(
+        "INSERT INTO classes (class_id, instructor_id, class_code, class_name, created_at) VALUES (?, ?, ?, ?, ?)",
+        [(c, i, f"C{c:04d}", f"Class {c}", now) for c, i in class_instructor.items()]
+    )
+
+    enrollments = set()
+    for s in range(instructors + 1, instructors + students + 1):
+        for c in rng.sample(range(1, classes + 1), min(4, classes)):
+            enrollments.add((c, s))
+    conn.exec_driver_sql(
+        "INSERT INTO enrollments (class_id, student_id, enrolled_at) VALUES (?, ?, ?)",
+        [(c, s, now) for c, s in enrollments]
+    )
+
+    assignments = []
+    for c in range(1, classes + 1):
+        for a in range(8):
+            assignments.append((len(assignments) + 1, c, class_instructor[c], f"Assignment {a}",
+                                now + timedelta(days=7 * a), 100, now))
+    conn.exec_driver_sql(
+        "INSERT INTO assignments (assignment_id, class_id, instructor_id, title, due_date, max_points, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)", assignments
+    )
+    conn.exec_driver_sql(
+        "INSERT INTO rubrics (assignment_id, criterion_name, max_points, created_at) VALUES (?, ?, 25, ?)",
+        [(a[0], f"Criterion {r}", now) for a in assignments for r in range(4)]
+    )
+
+    by_class = {}
+    for a in assignments:
+        by_class.setdefault(a[1], []).append(a[0])
+    submissions = []
+    for c, s in enrollments:
+        for a in by_class[c]:
+            if rng.random() < 0.7:
+                status = 'graded' if rng.random() < 0.5 else 'submitted'
+                submissions.append((len(submissions) + 1, a, s, 'text', status, now))
+    conn.exec_driver_sql(
+        "INSERT INTO submissions (submission_id, assignment_id, student_id, submission_text, status, submitted_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)", submissions
+    )
+    conn.exec_driver_sql(
+        "INSERT INTO grades (submission_id, rubric_id, points_earned, graded_by, graded_at) VALUES (?, ?, ?, 1, ?)",
+        [(sub[0], (sub[1] - 1) * 4 + r + 1, rng.randint(0, 25), now)
+         for sub in submissions if sub[4] == 'graded' for r in range(4)]
+    )
+    conn.exec_driver_sql("ANALYZE")
+
+    return {
+        'student_id': instructors + students // 2,
+        'assignment_id': len(assignments) // 2,
+        'class_id': classes // 2 or 1,
+        'instructor_id': 1,
+        'submission_id': len(submissions) // 2 or 1,
+    }
+
+
+def query_plan(conn, sql, params):
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def median_us(conn, sql, params, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.exec_driver_sql(sql, params).fetchall()
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=5000, help='number of synthetic students')
+    parser.add_argument('--repeat', type=int, default=50, help='timed runs per query')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='grading_bench_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    from app import app, db, upgrade_database
+
+    with app.app_context():
+        db.create_all()
+        upgrade_database(db.engine)
+
+        with db.engine.begin() as conn:
+            params = seed(conn, args.students)
+
+        with db.engine.connect() as conn:
+            print(f"Database: {workdir}/bench.db ({args.students} students)\n")
+            indexed = {}
+            for name, sql, expected in HOT_QUERIES:
+                bound = {k: v for k, v in params.items() if f":{k}" in sql}
+                plan = query_plan(conn, sql, bound)
+                uses_index = any(expected in line for line in plan)
+                indexed[name] = median_us(conn, sql, bound, args.repeat)
+                print(f"{'✅' if uses_index else '❌'} {name}")
+                for line in plan:
+                    print(f"     {line}")
+
+            # Same queries without the indexes from the hot_lookup_indexes migration
+            index_names = [row[0] for row in conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'ix_%'")]
+            for index_name in index_names:
+                conn.exec_driver_sql(f"DROP INDEX {index_name}")
+
+            print(f"\n{'query':<26}{'indexed µs':>12}{'no index µs':>14}{'speedup':>10}")
+            for name, sql, _ in HOT_QUERIES:
+                bound = {k: v for k, v in params.items() if f":{k}" in sql}
+                plain = median_us(conn, sql, bound, args.repeat)
+                print(f"{name:<26}{indexed[name]:>12.1f}{plain:>14.1f}{plain / indexed[name]:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic data generator for the load tests
+
+Fills an empty database (real schema: create_all + migrations) with a
+deterministic cohort at the requested scale: instructors, classes, students
+enrolled in several classes each, assignments with rubrics, submissions with
+essay-like text, and a grade per criterion plus an overall grade for the
+graded ones. The first half of each class's assignments are past due (some
+submitted late, most graded); the rest are due in the coming weeks and only
+partly submitted, which leaves room for a deadline burst. The same arguments
+and seed always give the same rows. Every user's password is PASSWORD.
+
+Rows go in through backends.copy_rows in batches (COPY on PostgreSQL), so
+memory stays flat at hundreds of thousands of submissions.
+
+Usage:
+    cd api
+    DATABASE_URL=sqlite:////tmp/bench.db python -m benchmarks.synthetic \\
+        --students 50000 --classes 2000 --submissions 500000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from backends import copy_rows, reset_sequences
+from benchmarks.payloads import WORDS
+from ids import ID_FORMATS
+from migrations import rebuild_assignment_stats
+
+PASSWORD = 'bench-password'
+LETTERS = ((90, 'A'), (80, 'B'), (70, 'C'), (60, 'D'), (0, 'F'))
+FEEDBACK = ('Clear structure', 'Needs more evidence', 'Good use of sources', 'Check the requirements again',
+            'Well argued', 'Missing the risk analysis', 'Excellent testing section', 'Referencing is inconsistent')
+
+
+def add_scale_arguments(parser):
+    """The scale options shared by this script and benchmarks.load."""
+    parser.add_argument('--students', type=int, default=5000, help='number of students')
+    parser.add_argument('--classes', type=int, default=200, help='number of classes (one instructor per 4)')
+    parser.add_argument('--submissions', type=int, default=50000,
+                        help='approximate number of submissions (capped by enrollments x assignments)')
+    parser.add_argument('--enrollments-per-student', type=int, default=4, help='classes each student takes')
+    parser.add_argument('--assignments-per-class', type=int, default=8, help='assignments in every class')
+    parser.add_argument('--criteria', type=int, default=4, help='rubric criteria per assignment')
+    parser.add_argument('--words', type=int, default=40, help='words per submission text')
+    parser.add_argument('--seed', type=int, default=569, help='random seed')
+
+
+def scale_options(args):
+    """generate() keyword arguments from parsed add_scale_arguments() options."""
+    return {
+        'students': args.students,
+        'classes': args.classes,
+        'submissions': args.submissions,
+        'enrollments_per_student': args.enrollments_per_student,
+        'assignments_per_class': args.assignments_per_class,
+        'criteria': args.criteria,
+        'words': args.words,
+        'seed_value': args.seed,
+    }
+
+
+def letter(percentage):
+    return next(grade for floor, grade in LETTERS if percentage >= floor)
+
+
+def generate(conn, tables, password_hash, students=5000, classes=200, submissions=50000,
+             enrollments_per_student=4, assignments_per_class=8, criteria=4, graded=0.8, words=40,
+             seed_value=569, batch_size=5000):
+    """
+    Fill the schema (tables: name -> Table, e.g. db.metadata.tables) inside the
+    caller's transaction. password_hash is stored for every user. Returns the
+    number of rows written per table.
+    """
+    rng = random.Random(seed_value)
+    now = datetime.utcnow().replace(microsecond=0)
+    instructors = max(1, classes // 4)
+    classes_per_student = min(enrollments_per_student, classes)
+    counts = {}
+    pending = {}
+
+    def add(table, row):
+        pending.setdefault(table, []).append(row)
+
+    def flush(*names):
+        # In foreign key order: a batch of grades must not reach the database before its submissions
+        for name in names:
+            counts[name] = counts.get(name, 0) + copy_rows(conn, tables[name], pending.pop(name, []))
+
+    student_prefix, student_first, _ = ID_FORMATS['student']
+    instructor_prefix, instructor_first, _ = ID_FORMATS['instructor']
+    for i in range(1, instructors + 1):
+        add('users', {'user_id': i, 'unique_id': f'{instructor_prefix}{instructor_first + i}',
+                      'email': f'instructor{i}@bench.test', 'password_hash': password_hash,
+                      'first_name': 'Instructor', 'last_name': str(i), 'role': 'instructor', 'created_at': now})
+    student_ids = range(instructors + 1, instructors + students + 1)
+    for n, user_id in enumerate(student_ids, start=1):
+        add('users', {'user_id': user_id, 'unique_id': f'{student_prefix}{student_first + n}',
+                      'email': f'student{n}@bench.test', 'password_hash': password_hash,
+                      'first_name': rng.choice(('Ada', 'Alan', 'Grace', 'Edsger', 'Barbara', 'Donald')),
+                      'last_name': f'Student{n}', 'role': 'student', 'created_at': now})
+        if len(pending.get('users', ())) >= batch_size:
+            flush('users')
+    flush('users')
+
+    instructor_of = {c: (c - 1) % instructors + 1 for c in range(1, classes + 1)}
+    for c, instructor_id in instructor_of.items():
+        add('classes', {'class_id': c, 'instructor_id': instructor_id, 'class_code': f'BENCH{c:05d}',
+                        'class_name': f'Benchmark class {c}', 'description': 'Synthetic', 'created_at': now})
+    flush('classes')
+
+    roster = {c: [] for c in instructor_of}
+    for student_id in student_ids:
+        for c in rng.sample(range(1, classes + 1), classes_per_student):
+            roster[c].append(student_id)
+            add('enrollments', {'class_id': c, 'student_id': student_id, 'enrolled_at': now})
+        if len(pending.get('enrollments', ())) >= batch_size:
+            flush('enrollments')
+    flush('enrollments')
+
+    # Weekly deadlines: the first half of each class's assignments are past, the rest upcoming
+    past = assignments_per_class // 2
+    criterion_max = 100 / criteria
+    assignments = {}
+    for c, instructor_id in instructor_of.items():
+        for a in range(assignments_per_class):
+            assignment_id = len(assignments) + 1
+            weeks = a - past if a < past else a - past + 1
+            due = now + timedelta(weeks=weeks)
+            assignments[assignment_id] = (c, instructor_id, due, a < past)
+            add('assignments', {'assignment_id': assignment_id, 'class_id': c, 'instructor_id': instructor_id,
+                                'title': f'Assignment {a + 1}', 'description': 'Synthetic assignment',
+                                'due_date': due, 'max_points': 100, 'created_at': now})
+            for r in range(criteria):
+                add('rubrics', {'rubric_id': (assignment_id - 1) * criteria + r + 1, 'assignment_id': assignment_id,
+                                'criterion_name': f'Criterion {r + 1}', 'max_points': criterion_max,
+                                'description': 'Synthetic criterion', 'created_at': now})
+        if len(pending.get('assignments', ())) + len(pending.get('rubrics', ())) >= batch_size:
+            flush('assignments', 'rubrics')
+    flush('assignments', 'rubrics')
+
+    pairs = sum(len(students_in) for students_in in roster.values()) * assignments_per_class
+    rate = min(1.0, submissions / pairs) if pairs else 0
+    submission_id = 0
+    for assignment_id, (c, instructor_id, due, is_past) in assignments.items():
+        for student_id in roster[c]:
+            if rng.random() >= rate:
+                continue
+            submission_id += 1
+            if is_past:
+                # About 5% late
+                hours = rng.uniform(0, 24) if rng.random() < 0.05 else -rng.uniform(0, 72)
+                submitted_at = due + timedelta(hours=hours)
+            else:
+                submitted_at = now - timedelta(hours=rng.uniform(0, 72))
+            status = 'graded' if is_past and rng.random() < graded else 'submitted'
+            add('submissions', {'submission_id': submission_id, 'assignment_id': assignment_id,
+                                'student_id': student_id, 'submission_text': ' '.join(rng.choices(WORDS, k=words)),
+                                'file_path': '', 'status': status, 'submitted_at': submitted_at})
+            if status != 'graded':
+                continue
+
+            graded_at = submitted_at + timedelta(days=rng.uniform(1, 5))
+            total = 0
+            for r in range(criteria):
+                points = round(rng.uniform(0.3, 1.0) * criterion_max, 1)
+                total += points
+                add('grades', {'submission_id': submission_id, 'rubric_id': (assignment_id - 1) * criteria + r + 1,
+                               'points_earned': points, 'feedback': rng.choice(FEEDBACK) if rng.random() < 0.5 else None,
+                               'graded_by': instructor_id, 'graded_at': graded_at})
+            add('overall_grades', {'submission_id': submission_id, 'total_points': round(total, 1),
+                                   'letter_grade': letter(total), 'overall_feedback': rng.choice(FEEDBACK),
+                                   'graded_by': instructor_id, 'graded_at': graded_at})
+        if len(pending.get('submissions', ())) >= batch_size:
+            flush('submissions', 'grades', 'overall_grades')
+    flush('submissions', 'grades', 'overall_grades')
+
+    # Registrations after the load must not be handed the generated unique IDs
+    sequences = tables['id_sequences']
+    for role, next_value in (('student', student_first + students + 1), ('instructor', instructor_first + instructors + 1)):
+        conn.execute(update(sequences).where(sequences.c.name == role).values(next_value=next_value))
+    reset_sequences(conn, [tables[name] for name in counts])
+    rebuild_assignment_stats(conn)
+    conn.exec_driver_sql("ANALYZE")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    from app import app, db, upgrade_database, password_hasher, User
+
+    with app.app_context():
+        db.create_all()
+        upgrade_database(db.engine)
+        if db.session.query(User.user_id).first() is not None:
+            raise SystemExit('The database already has users; generate into an empty database')
+
+        start = time.perf_counter()
+        with db.engine.begin() as conn:
+            counts = generate(conn, db.metadata.tables, password_hasher.hash(PASSWORD), **scale_options(args))
+        for table, rows in counts.items():
+            print(f"✅ {table}: {rows} rows")
+        print(f"✅ Generated in {time.perf_counter() - start:.1f}s; every password is {PASSWORD!r}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Write-burst load test for the SQLite connection profiles
+
+Simulates deadline night: writer processes insert submissions in bursts of
+transactions while reader processes keep running the student gradebook
+query. Each DB_PROFILE runs against its own fresh database in a separate
+interpreter (the pragmas are installed when app.py is imported), and the
+report shows read latency and how many operations failed with
+"database is locked".
+
+Usage:
+    cd api
+    python -m benchmarks.write_burst --students 2000 --seconds 5
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy.exc import OperationalError
+
+GRADEBOOK_SQL = (
+    "SELECT s.submission_id, g.rubric_id, g.points_earned FROM submissions s "
+    "LEFT JOIN grades g ON g.submission_id = s.submission_id "
+    "WHERE s.student_id = ? AND s.status = 'graded'"
+)
+INSERT_SQL = (
+    "INSERT INTO submissions (assignment_id, student_id, submission_text, status, submitted_at) "
+    "VALUES (?, ?, ?, 'submitted', ?)"
+)
+
+
+def writer(engine, params, deadline, burst, results):
+    engine.dispose()  # never share pooled connections across fork
+    written = locked = 0
+    text = 'x' * 2000
+    while time.monotonic() < deadline:
+        try:
+            with engine.begin() as conn:
+                conn.exec_driver_sql(
+                    INSERT_SQL,
+                    [(params['assignment_id'], params['student_id'], text, datetime.utcnow())] * burst
+                )
+                # Hold the write transaction briefly, like a request doing work before commit
+                time.sleep(0.005)
+            written += burst
+        except OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            locked += 1
+    results.put({'kind': 'writer', 'written': written, 'locked': locked})
+
+
+def reader(engine, params, deadline, results):
+    engine.dispose()
+    timings = []
+    locked = 0
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.exec_driver_sql(GRADEBOOK_SQL, (params['student_id'],)).fetchall()
+        except OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            locked += 1
+            continue
+        timings.append((time.perf_counter() - start) * 1000)
+    results.put({'kind': 'reader', 'timings': timings, 'locked': locked})
+
+
+def run_profile(args):
+    """Child mode: seed a fresh database under the current DB_PROFILE and run the burst."""
+    from app import app, db, upgrade_database
+    from benchmarks.query_plans import seed
+
+    with app.app_context():
+        db.create_all()
+        upgrade_database(db.engine)
+        with db.engine.begin() as conn:
+            params = seed(conn, args.students)
+        engine = db.engine
+
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    deadline = time.monotonic() + args.seconds
+    workers = [context.Process(target=writer, args=(engine, params, deadline, args.burst, results))
+               for _ in range(args.writers)]
+    workers += [context.Process(target=reader, args=(engine, params, deadline, results))
+                for _ in range(args.readers)]
+    for process in workers:
+        process.start()
+    reports = [results.get() for _ in workers]
+    for process in workers:
+        process.join()
+
+    timings = sorted(t for r in reports if r['kind'] == 'reader' for t in r['timings'])
+    return {
+        'written': sum(r['written'] for r in reports if r['kind'] == 'writer'),
+        'write_locked': sum(r['locked'] for r in reports if r['kind'] == 'writer'),
+        'reads': len(timings),
+        'read_locked': sum(r['locked'] for r in reports if r['kind'] == 'reader'),
+        'p50': statistics.median(timings) if timings else 0.0,
+        'p99': timings[int(len(timings) * 0.99)] if timings else 0.0,
+        'max': timings[-1] if timings else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=2000, help='number of synthetic students')
+    parser.add_argument('--seconds', type=float, default=5, help='length of the burst')
+    parser.add_argument('--writers', type=int, default=4, help='writer processes')
+    parser.add_argument('--readers', type=int, default=4, help='reader processes')
+    parser.add_argument('--burst', type=int, default=50, help='rows inserted per write transaction')
+    parser.add_argument('--profiles', default='default,production', help='comma-separated DB_PROFILE values')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_profile(args)))
+        return
+
+    print(f"{args.writers} writers x {args.burst} rows/txn, {args.readers} readers, {args.seconds:g}s\n")
+    print(f"{'profile':<12}{'rows written':>14}{'reads':>8}{'locked':>8}"
+          f"{'read p50 ms':>13}{'read p99 ms':>13}{'read max ms':>13}")
+    for profile in args.profiles.split(','):
+        workdir = tempfile.mkdtemp(prefix='grading_burst_')
+        env = dict(os.environ, DB_PROFILE=profile,
+                   DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.write_burst', '--child'] + sys.argv[1:],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        r = json.loads(output.strip().splitlines()[-1])
+        print(f"{profile:<12}{r['written']:>14}{r['reads']:>8}{r['write_locked'] + r['read_locked']:>8}"
+              f"{r['p50']:>13.2f}{r['p99']:>13.2f}{r['max']:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
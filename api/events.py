@@ -0,0 +1,205 @@
+"""
+Server-sent events for the COM569 Assignment Grading System
+
+Write paths publish small delta events (a submission was created or deleted,
+a grade was saved or published) after their transaction commits. Clients hold
+one GET /api/events stream open instead of re-fetching whole lists; each
+stream only gets the events of the classes or student it subscribed to.
+
+Every event gets an increasing id and the last buffer_size events are kept,
+so a client that reconnects with Last-Event-ID is sent what it missed. If the
+id is no longer in the buffer the client gets a "reset" event and should
+reload its lists.
+
+The same log carries internal events between worker processes: an
+EventFollower reads them, e.g. to drop cached permissions that another
+process changed.
+
+Logs:
+    MemoryEventLog - in-process; only correct with a single worker process
+    SQLiteEventLog - a local SQLite file shared by every worker on the host,
+                     which streams poll for new events
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque, namedtuple
+from datetime import date
+
+Event = namedtuple('Event', 'event_id type class_id student_id data')
+
+
+def _encode(data):
+    def iso(o):
+        if isinstance(o, date):
+            return o.isoformat()
+        raise TypeError(f'{type(o).__name__} is not JSON serializable')
+    return json.dumps(data, default=iso, sort_keys=True, separators=(',', ':'))
+
+
+class MemoryEventLog:
+    """The last buffer_size events in a deque; waiting streams are woken on publish. Thread-safe."""
+
+    def __init__(self, buffer_size=1000):
+        self._events = deque(maxlen=buffer_size)
+        self._last_id = 0
+        self._changed = threading.Condition()
+
+    def publish(self, type, class_id, student_id, data):
+        with self._changed:
+            self._last_id += 1
+            event = Event(self._last_id, type, class_id, student_id, _encode(data))
+            self._events.append(event)
+            self._changed.notify_all()
+        return event
+
+    def latest_id(self):
+        with self._changed:
+            return self._last_id
+
+    def since(self, last_id):
+        """Events after last_id, or None when some of them have already left the buffer."""
+        with self._changed:
+            oldest = self._events[0].event_id if self._events else self._last_id + 1
+            if last_id > self._last_id or last_id < oldest - 1:
+                return None
+            return [event for event in self._events if event.event_id > last_id]
+
+    def wait(self, last_id, timeout):
+        """Block until an event after last_id exists or timeout passes. True if there is one."""
+        with self._changed:
+            return self._changed.wait_for(lambda: self._last_id > last_id, timeout)
+
+
+class SQLiteEventLog:
+    """
+    Events in a local SQLite file, so a stream served by one worker sees events
+    published by another. Streams poll every poll_interval seconds while idle;
+    the buffer is trimmed to buffer_size every TRIM_EVERY publishes.
+    """
+
+    TRIM_EVERY = 100
+
+    def __init__(self, path, buffer_size=1000, poll_interval=0.5):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        self._published = 0
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS events (event_id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                         'type TEXT NOT NULL, class_id INTEGER, student_id INTEGER, data TEXT NOT NULL)')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def publish(self, type, class_id, student_id, data):
+        conn = self._connection()
+        encoded = _encode(data)
+        event_id = conn.execute('INSERT INTO events (type, class_id, student_id, data) VALUES (?, ?, ?, ?)',
+                                (type, class_id, student_id, encoded)).lastrowid
+        self._published += 1
+        if self._published % self.TRIM_EVERY == 0:
+            conn.execute('DELETE FROM events WHERE event_id <= ?', (event_id - self.buffer_size,))
+        return Event(event_id, type, class_id, student_id, encoded)
+
+    def latest_id(self):
+        row = self._connection().execute("SELECT seq FROM sqlite_sequence WHERE name = 'events'").fetchone()
+        return row[0] if row else 0
+
+    def since(self, last_id):
+        """Events after last_id, or None when some of them have already left the buffer."""
+        conn = self._connection()
+        oldest = conn.execute('SELECT MIN(event_id) FROM events').fetchone()[0]
+        latest = self.latest_id()
+        if last_id > latest or (oldest is not None and last_id < oldest - 1):
+            return None
+        rows = conn.execute('SELECT event_id, type, class_id, student_id, data FROM events '
+                            'WHERE event_id > ? ORDER BY event_id', (last_id,))
+        return [Event(*row) for row in rows]
+
+    def wait(self, last_id, timeout):
+        """Poll until an event after last_id exists or timeout passes. True if there is one."""
+        deadline = time.monotonic() + timeout
+        while self.latest_id() <= last_id:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.poll_interval, remaining))
+        return True
+
+
+class EventFollower:
+    """
+    Reads a log's events of the given types as other processes publish them,
+    for state each process keeps for itself (e.g. cached permissions). poll()
+    returns the new ones at most every interval seconds and [] in between, or
+    None when some left the buffer unread. Thread-safe.
+    """
+
+    def __init__(self, log, types, interval=1.0):
+        self.log = log
+        self.types = set(types)
+        self.interval = interval
+        self._last_id = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def poll(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.interval or not self._lock.acquire(blocking=False):
+            return []
+        try:
+            self._checked_at = now
+            latest = self.log.latest_id()
+            if self._last_id is None or self._last_id == latest:
+                # Events from before the first poll predate anything the caller has cached
+                self._last_id = latest
+                return []
+            events = self.log.since(self._last_id)
+            if events is None:
+                self._last_id = latest
+                return None
+            if events:
+                self._last_id = events[-1].event_id
+            return [event for event in events if event.type in self.types]
+        finally:
+            self._lock.release()
+
+
+def format_event(event_id, type, data):
+    return f"id: {event_id}\nevent: {type}\ndata: {data}\n\n"
+
+
+def stream(log, last_id, matches, duration, heartbeat=15, retry_ms=3000):
+    """
+    Generate an SSE stream of the events after last_id (None: only new ones)
+    for which matches(event) is true, for duration seconds. Idle streams get a
+    comment line every heartbeat seconds so proxies keep them open; when the
+    stream ends the browser reconnects with Last-Event-ID after retry_ms.
+    """
+    yield f"retry: {retry_ms}\n\n"
+    if last_id is None:
+        last_id = log.latest_id()
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        events = log.since(last_id)
+        if events is None:
+            last_id = log.latest_id()
+            yield format_event(last_id, 'reset', '{}')
+            continue
+        for event in events:
+            last_id = event.event_id
+            if matches(event):
+                yield format_event(event.event_id, event.type, event.data)
+        if not log.wait(last_id, min(heartbeat, max(deadline - time.monotonic(), 0))):
+            yield ": keepalive\n\n"
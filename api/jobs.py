@@ -0,0 +1,240 @@
+"""
+Background jobs for the COM569 Assignment Grading System
+
+CSV exports, roster imports and class deletion can take far longer than an
+interactive request. Asked to run in the background, their endpoints insert
+a row into the jobs table and answer 202 with the job's URL; a pool of worker
+processes (flask --app app run-jobs) claims queued rows, runs them and stores
+the outcome: a small JSON result and, for exports, a file artifact to
+download. The database is the queue, so there is no broker to run.
+
+A worker claims a job with a single UPDATE ... WHERE job_id = (oldest
+eligible job) ... RETURNING, so no two workers ever run the same job
+(PostgreSQL also takes a transaction-level advisory lock around it). A job is
+eligible when it is queued and due, and fewer jobs of its kind than the
+kind's concurrency limit are running. A job that raises is queued again after
+retry_delay * 2^(attempt - 1) seconds until it has used max_attempts (JobFailed
+fails it at once, for errors a retry can't fix). A job
+whose worker died stays running until its lease expires, then counts as a
+failed attempt. Artifacts are deleted artifact_ttl seconds after the job
+finishes.
+"""
+
+import json
+import os
+import shutil
+import signal
+import socket
+import time
+import traceback
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import multiprocessing
+
+from sqlalchemy import and_, case, func, or_, select, update
+
+# Statuses a job ends in; queued and running are the only others
+FINISHED = ('succeeded', 'failed', 'cancelled')
+# Arbitrary key for pg_advisory_xact_lock, serializing claims so concurrency limits hold
+CLAIM_LOCK = 569_0001
+SWEEP_EVERY = 60
+
+Handler = namedtuple('Handler', 'run concurrency max_attempts')
+
+
+class JobFailed(Exception):
+    """Raised by a handler for a failure retrying can't fix, e.g. its class was deleted."""
+
+
+class JobContext:
+    """What a handler gets besides its params: the job id and a place to write its artifact."""
+
+    def __init__(self, queue, job):
+        self.job_id = job.job_id
+        self.attempt = job.attempts
+        self._directory = os.path.join(queue.artifact_dir, str(job.job_id))
+        self.artifact = None
+
+    @contextmanager
+    def open_artifact(self, name, mimetype, mode='w', **kwargs):
+        """Open the job's artifact file for writing; a retry starts it afresh."""
+        shutil.rmtree(self._directory, ignore_errors=True)
+        os.makedirs(self._directory)
+        path = os.path.join(self._directory, os.path.basename(name))
+        with open(path, mode, **kwargs) as f:
+            yield f
+        self.artifact = {'artifact_path': path, 'artifact_name': os.path.basename(name),
+                         'artifact_type': mimetype, 'artifact_size': os.path.getsize(path)}
+
+
+class JobQueue:
+    """Job handlers by kind plus the claim/finish/retry logic over the jobs table."""
+
+    def __init__(self, table, artifact_dir, artifact_ttl=24 * 3600, lease=3600, retry_delay=30):
+        self.table = table
+        self.artifact_dir = artifact_dir
+        self.artifact_ttl = artifact_ttl
+        self.lease = lease
+        self.retry_delay = retry_delay
+        self.handlers = {}
+
+    def handler(self, kind, concurrency=1, max_attempts=3):
+        """Register fn(params, context) as the handler of kind; it returns the job's JSON result."""
+        def register(fn):
+            self.handlers[kind] = Handler(fn, concurrency, max_attempts)
+            return fn
+        return register
+
+    def submit(self, conn, kind, params, created_by=None, class_id=None):
+        """Queue a job in the caller's transaction; returns its id."""
+        now = datetime.utcnow()
+        return conn.execute(self.table.insert().values(
+            kind=kind, status='queued', params=json.dumps(params), created_by=created_by, class_id=class_id,
+            attempts=0, max_attempts=self.handlers[kind].max_attempts, run_after=now, created_at=now
+        )).inserted_primary_key[0]
+
+    def cancel(self, conn, job_id):
+        """Cancel a job that hasn't started. True if it was still queued."""
+        t = self.table
+        return conn.execute(update(t).where(t.c.job_id == job_id, t.c.status == 'queued')
+                            .values(status='cancelled', finished_at=datetime.utcnow())).rowcount == 1
+
+    def claim(self, engine, worker):
+        """Mark the oldest eligible job running for worker and return its row, or None."""
+        t = self.table
+        now = datetime.utcnow()
+        job = t.alias('j')
+        other = t.alias('r')
+        running = select(func.count()).where(
+            other.c.kind == job.c.kind, other.c.status == 'running', other.c.lease_expires_at >= now
+        ).scalar_subquery()
+        limit = case({kind: handler.concurrency for kind, handler in self.handlers.items()},
+                     value=job.c.kind, else_=0)
+        claimable = or_(
+            and_(t.c.status == 'queued', t.c.run_after <= now),
+            and_(t.c.status == 'running', t.c.lease_expires_at < now, t.c.attempts < t.c.max_attempts)
+        )
+        oldest = select(job.c.job_id).where(
+            or_(and_(job.c.status == 'queued', job.c.run_after <= now),
+                and_(job.c.status == 'running', job.c.lease_expires_at < now, job.c.attempts < job.c.max_attempts)),
+            job.c.kind.in_(list(self.handlers)),
+            running < limit
+        ).order_by(job.c.run_after, job.c.job_id).limit(1).scalar_subquery()
+
+        with engine.begin() as conn:
+            if conn.dialect.name == 'postgresql':
+                conn.execute(select(func.pg_advisory_xact_lock(CLAIM_LOCK)))
+            return conn.execute(
+                update(t).where(t.c.job_id == oldest, claimable).values(
+                    status='running', worker=worker, attempts=t.c.attempts + 1, started_at=now,
+                    lease_expires_at=now + timedelta(seconds=self.lease), error=None
+                ).returning(*t.c)
+            ).first()
+
+    def execute(self, engine, job):
+        """Run a claimed job and record its outcome; returns the job's final row."""
+        t = self.table
+        context = JobContext(self, job)
+        try:
+            result = self.handlers[job.kind].run(json.loads(job.params), context)
+        except Exception as error:
+            now = datetime.utcnow()
+            if isinstance(error, JobFailed):
+                message = str(error)
+            else:
+                message = ''.join(traceback.format_exception_only(type(error), error)).strip()
+            if job.attempts < job.max_attempts and not isinstance(error, JobFailed):
+                values = {'status': 'queued', 'error': message,
+                          'run_after': now + timedelta(seconds=self.retry_delay * 2 ** (job.attempts - 1))}
+            else:
+                values = {'status': 'failed', 'error': message, 'finished_at': now}
+        else:
+            now = datetime.utcnow()
+            values = {'status': 'succeeded', 'result': json.dumps(result), 'finished_at': now,
+                      **(context.artifact or {})}
+            if context.artifact:
+                values['expires_at'] = now + timedelta(seconds=self.artifact_ttl)
+
+        with engine.begin() as conn:
+            # A worker whose lease ran out may have lost the job to another; only the holder records
+            return conn.execute(update(t).where(t.c.job_id == job.job_id, t.c.worker == job.worker,
+                                                t.c.attempts == job.attempts)
+                                .values(**values).returning(*t.c)).first()
+
+    def sweep(self, engine):
+        """Fail jobs whose last attempt's worker died, and delete expired artifacts."""
+        t = self.table
+        now = datetime.utcnow()
+        with engine.begin() as conn:
+            conn.execute(update(t).where(
+                t.c.status == 'running', t.c.lease_expires_at < now, t.c.attempts >= t.c.max_attempts
+            ).values(status='failed', error='Worker stopped before the job finished', finished_at=now))
+            expired = conn.execute(select(t.c.job_id).where(
+                t.c.artifact_path.is_not(None), t.c.expires_at < now)).scalars().all()
+            if expired:
+                conn.execute(update(t).where(t.c.job_id.in_(expired)).values(artifact_path=None))
+        for job_id in expired:
+            shutil.rmtree(os.path.join(self.artifact_dir, str(job_id)), ignore_errors=True)
+        return len(expired)
+
+    def work(self, engine, poll_interval=1.0, on_finished=None, after_job=None, stopping=lambda: False,
+             drain=False):
+        """
+        Claim and run jobs until stopping() is true, sleeping poll_interval when
+        there are none (or, with drain, returning). on_finished(row) is called
+        for each job that ends, after_job() after every attempt.
+        """
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        last_sweep = 0
+        while not stopping():
+            if time.monotonic() - last_sweep > SWEEP_EVERY:
+                self.sweep(engine)
+                last_sweep = time.monotonic()
+            job = self.claim(engine, worker)
+            if job is None:
+                if drain:
+                    return
+                time.sleep(poll_interval)
+                continue
+            try:
+                finished = self.execute(engine, job)
+            finally:
+                if after_job:
+                    after_job()
+            if finished is not None and finished.status in FINISHED and on_finished:
+                on_finished(finished)
+
+
+def _child(target):
+    stopped = []
+    signal.signal(signal.SIGTERM, lambda *args: stopped.append(True))
+    signal.signal(signal.SIGINT, lambda *args: stopped.append(True))
+    target(lambda: bool(stopped))
+
+
+def run_pool(processes, target):
+    """
+    Run target(stopping) in processes forked child processes until SIGTERM or
+    SIGINT, restarting any child that exits on its own. On shutdown children
+    get SIGTERM, after which stopping() is true; they should return once their
+    current job is done.
+    """
+    context = multiprocessing.get_context('fork')
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *args: stopping.append(True))
+    signal.signal(signal.SIGINT, lambda *args: stopping.append(True))
+
+    children = []
+    while not stopping:
+        children = [child for child in children if child.is_alive()]
+        while len(children) < processes:
+            child = context.Process(target=_child, args=(target,), daemon=False)
+            child.start()
+            children.append(child)
+        time.sleep(0.5)
+
+    for child in children:
+        child.terminate()
+    for child in children:
+        child.join()
@@ -0,0 +1,243 @@
+"""
+Versioned schema migrations for the COM569 Assignment Grading System
+
+db.create_all() only creates missing tables, so anything added to an
+existing table (indexes, new columns) ships here as a numbered migration.
+Applied versions are recorded in the schema_migrations table, so running
+upgrade() again is a no-op.
+
+Usage:
+    cd api
+    flask --app app db-upgrade
+"""
+
+import re
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+from search import index_statements as search_index_statements
+
+
+class MigrationError(RuntimeError):
+    """A migration can't be applied to the data as it is; the message says what to do."""
+
+
+# Criterion grades superseded by a later grade for the same submission and criterion
+_NOT_LATEST_GRADE = "grade_id NOT IN (SELECT MAX(grade_id) FROM grades GROUP BY submission_id, rubric_id)"
+
+
+def _grades_unique_index(conn):
+    # Regrades used to append rows; deleting grades is the operator's call, not the upgrade's
+    duplicates = conn.execute(text(f"SELECT COUNT(*) FROM grades WHERE {_NOT_LATEST_GRADE}")).scalar()
+    if duplicates:
+        raise MigrationError(
+            f"{duplicates} criterion grades are older duplicates of a later grade for the same submission "
+            f"and criterion. Run `flask --app app compact-grades` to delete them (keeping the latest), "
+            f"then upgrade again."
+        )
+    create_grades_unique_index(conn)
+
+
+def delete_duplicate_grades(conn):
+    """Delete every criterion grade but the latest per submission and criterion. Returns the count."""
+    return conn.execute(text(f"DELETE FROM grades WHERE {_NOT_LATEST_GRADE}")).rowcount
+
+
+def create_grades_unique_index(conn):
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_grades_submission_rubric "
+        "ON grades (submission_id, coalesce(rubric_id, 0))"
+    ))
+
+
+def _hot_lookup_indexes(conn):
+    statements = [
+        # Class roster and "already enrolled?" checks
+        "CREATE INDEX IF NOT EXISTS ix_enrollments_class_student ON enrollments (class_id, student_id)",
+        # A student's classes
+        "CREATE INDEX IF NOT EXISTS ix_enrollments_student ON enrollments (student_id)",
+        # Gradebook: a student's graded submissions
+        "CREATE INDEX IF NOT EXISTS ix_submissions_student_status ON submissions (student_id, status)",
+        # CSV export and submission lists for an assignment
+        "CREATE INDEX IF NOT EXISTS ix_submissions_assignment_status ON submissions (assignment_id, status)",
+        "CREATE INDEX IF NOT EXISTS ix_rubrics_assignment ON rubrics (assignment_id)",
+        "CREATE INDEX IF NOT EXISTS ix_assignments_class_due ON assignments (class_id, due_date)",
+        "CREATE INDEX IF NOT EXISTS ix_assignments_instructor ON assignments (instructor_id)",
+        "CREATE INDEX IF NOT EXISTS ix_classes_instructor ON classes (instructor_id)",
+    ]
+    for statement in statements:
+        conn.execute(text(statement))
+
+
+def _assignment_stats(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS assignment_stats ("
+        "assignment_id INTEGER NOT NULL PRIMARY KEY REFERENCES assignments (assignment_id), "
+        "submitted_count INTEGER NOT NULL DEFAULT 0, "
+        "graded_count INTEGER NOT NULL DEFAULT 0, "
+        "late_count INTEGER NOT NULL DEFAULT 0)"
+    ))
+    # Backfill from the existing submissions; from here on the write paths keep it current
+    rebuild_assignment_stats(conn)
+
+
+def rebuild_assignment_stats(conn):
+    """Recount assignment_stats from the submissions table."""
+    conn.execute(text("DELETE FROM assignment_stats"))
+    conn.execute(text("""
+        INSERT INTO assignment_stats (assignment_id, submitted_count, graded_count, late_count)
+        SELECT a.assignment_id,
+               COUNT(s.submission_id),
+               COALESCE(SUM(CASE WHEN s.status = 'graded' THEN 1 ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN s.submitted_at > a.due_date THEN 1 ELSE 0 END), 0)
+        FROM assignments a
+        LEFT JOIN submissions s ON s.assignment_id = a.assignment_id
+        GROUP BY a.assignment_id
+    """))
+
+
+# (child table, column, parent table, parent column): rows that go away with their parent
+CASCADES = [
+    ('enrollments', 'class_id', 'classes', 'class_id'),
+    ('assignments', 'class_id', 'classes', 'class_id'),
+    ('rubrics', 'assignment_id', 'assignments', 'assignment_id'),
+    ('submissions', 'assignment_id', 'assignments', 'assignment_id'),
+    ('assignment_stats', 'assignment_id', 'assignments', 'assignment_id'),
+    ('grades', 'submission_id', 'submissions', 'submission_id'),
+    ('grades', 'rubric_id', 'rubrics', 'rubric_id'),
+    ('overall_grades', 'submission_id', 'submissions', 'submission_id'),
+]
+
+
+def _cascade_deletes(conn):
+    # Orphans left by deletes from before foreign keys were enforced; parents first so it cascades down
+    for child, column, parent, parent_column in CASCADES:
+        conn.execute(text(
+            f"DELETE FROM {child} WHERE {column} IS NOT NULL "
+            f"AND {column} NOT IN (SELECT {parent_column} FROM {parent})"
+        ))
+
+    if conn.dialect.name != 'sqlite':
+        inspector = inspect(conn)
+        for child, column, parent, parent_column in CASCADES:
+            for fk in inspector.get_foreign_keys(child):
+                if fk['constrained_columns'] != [column] or \
+                        (fk['options'].get('ondelete') or '').upper() == 'CASCADE':
+                    continue
+                conn.execute(text(f"ALTER TABLE {child} DROP CONSTRAINT {fk['name']}"))
+                conn.execute(text(
+                    f"ALTER TABLE {child} ADD CONSTRAINT {fk['name']} FOREIGN KEY ({column}) "
+                    f"REFERENCES {parent} ({parent_column}) ON DELETE CASCADE"
+                ))
+        return
+
+    # SQLite can't alter a constraint: rebuild each child table from its own CREATE statement
+    # with ON DELETE CASCADE added, then recreate its indexes (upgrade() has foreign keys off)
+    rebuilt = {}
+    for child, column, parent, parent_column in CASCADES:
+        sql = rebuilt.get(child) or conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': child}
+        ).scalar()
+        reference = re.compile(
+            rf'(\b{column}\b[^,]*?REFERENCES\s+"?{parent}"?\s*\(\s*"?{parent_column}"?\s*\))(?!\s*ON DELETE)', re.I)
+        if reference.search(sql):
+            rebuilt[child] = reference.sub(r'\1 ON DELETE CASCADE', sql, count=1)
+        elif not re.search(rf'\b{column}\b[^,]*?REFERENCES\s+"?{parent}"?[^,]*ON DELETE CASCADE', sql, re.I):
+            raise MigrationError(f"No foreign key {child}.{column} -> {parent} to add ON DELETE CASCADE to")
+
+    for table, sql in rebuilt.items():
+        indexes = [row[0] for row in conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :name AND sql IS NOT NULL"
+        ), {'name': table})]
+        conn.exec_driver_sql(re.sub(rf'^\s*CREATE TABLE\s+"?{table}"?', f'CREATE TABLE {table}__new', sql))
+        conn.exec_driver_sql(f"INSERT INTO {table}__new SELECT * FROM {table}")
+        conn.exec_driver_sql(f"DROP TABLE {table}")
+        conn.exec_driver_sql(f"ALTER TABLE {table}__new RENAME TO {table}")
+        for index_sql in indexes:
+            conn.exec_driver_sql(index_sql)
+
+
+def _id_sequences(conn):
+    # Counters for ids.py; numbers start at the bottom of each range, skipping IDs already taken at random
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS id_sequences (name VARCHAR(20) NOT NULL PRIMARY KEY, next_value INTEGER NOT NULL)"
+    ))
+    seeded = set(conn.execute(text("SELECT name FROM id_sequences")).scalars())
+    for name, first in (('student', 10000000), ('instructor', 10000)):
+        if name not in seeded:
+            conn.execute(text("INSERT INTO id_sequences (name, next_value) VALUES (:name, :first)"),
+                         {'name': name, 'first': first})
+
+
+def _search_index(conn):
+    # FTS5 table and triggers on SQLite, GIN expression indexes on PostgreSQL (see search.py)
+    for statement in search_index_statements(conn.dialect.name):
+        conn.exec_driver_sql(statement)
+
+
+# (version, name, function) - append only, never renumber
+MIGRATIONS = [
+    (1, 'grades_unique_index', _grades_unique_index),
+    (2, 'hot_lookup_indexes', _hot_lookup_indexes),
+    (3, 'assignment_stats', _assignment_stats),
+    (4, 'cascade_deletes', _cascade_deletes),
+    (5, 'id_sequences', _id_sequences),
+    (6, 'search_index', _search_index),
+]
+
+
+def current_version(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, applied_at TIMESTAMP NOT NULL)"
+    ))
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")).scalar()
+
+
+def applied_version(conn):
+    """Schema version of a database without creating anything in it; 0 if it was never upgraded."""
+    if not inspect(conn).has_table('schema_migrations'):
+        return 0
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")).scalar()
+
+
+def latest_version():
+    return MIGRATIONS[-1][0]
+
+
+@contextmanager
+def _foreign_keys_off(conn):
+    # SQLite table rebuilds need enforcement off, and the pragma is ignored inside a transaction
+    if conn.dialect.name != 'sqlite':
+        yield
+        return
+    enabled = conn.exec_driver_sql("PRAGMA foreign_keys").scalar()
+    conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+    conn.commit()
+    try:
+        yield
+    finally:
+        conn.exec_driver_sql(f"PRAGMA foreign_keys={'ON' if enabled else 'OFF'}")
+        conn.commit()
+
+
+def upgrade(engine):
+    """Apply every pending migration, each in its own transaction. Returns the names applied."""
+    applied = []
+    with engine.begin() as conn:
+        version = current_version(conn)
+
+    for number, name, migrate in MIGRATIONS:
+        if number <= version:
+            continue
+        with engine.connect() as conn, _foreign_keys_off(conn), conn.begin():
+            migrate(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :t)"),
+                {'v': number, 'n': name, 't': datetime.utcnow()}
+            )
+        applied.append(name)
+
+    return applied
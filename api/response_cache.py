@@ -0,0 +1,212 @@
+"""
+Response cache for the COM569 Assignment Grading System
+
+Students reload their class, assignment and rubric lists constantly while the
+data behind them changes a few times a term. Those GET responses are cached
+fully serialized, keyed by the request and by the current version of every
+table the endpoint reads. Committing a write to a table bumps its version, so
+entries built from the old data are never looked up again and age out of the
+LRU. Each entry carries a strong ETag (a hash of the body) for conditional
+GETs, so a hit costs neither a query nor a serialization.
+
+Backends:
+    MemoryBackend - in-process LRU; versions are per process, so only use it
+                    with a single worker
+    SQLiteBackend - a local SQLite file shared by every worker on the host
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+
+# Table written by a statement, as SQLAlchemy and the raw SQL in this project spell it
+WRITE_STATEMENT = re.compile(
+    r'^\s*(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|UPDATE|DELETE\s+FROM|COPY)\s+"?(\w+)', re.IGNORECASE
+)
+_WRITTEN_TABLES = 'response_cache.written_tables'
+_CONNECTIONS = 'response_cache.connections'
+
+
+class CachedResponse:
+    __slots__ = ('body', 'headers', 'etag')
+
+    def __init__(self, body, headers, etag=None):
+        self.body = body
+        self.headers = headers
+        self.etag = etag or hashlib.sha256(body).hexdigest()[:32]
+
+
+class MemoryBackend:
+    """Bounded LRU of cache key -> CachedResponse plus per-table versions. Thread-safe."""
+
+    def __init__(self, maxsize=2048):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def versions(self, tables):
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+    def bump(self, tables):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend:
+    """
+    Entries and versions in a local SQLite file, so every gunicorn worker (and
+    the flask CLI) sees the same versions. One connection per thread and process.
+    Lookups are read-only so workers never queue for the write lock on a hit;
+    the oldest entries beyond maxsize are trimmed every TRIM_EVERY stores.
+    """
+
+    TRIM_EVERY = 64
+
+    def __init__(self, path, maxsize=2048):
+        self.path = path
+        self.maxsize = maxsize
+        self._local = threading.local()
+        self._stores = 0
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, etag TEXT NOT NULL, '
+                         'headers TEXT NOT NULL, body BLOB NOT NULL, stored_at REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_entries_stored_at ON entries (stored_at)')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def versions(self, tables):
+        placeholders = ', '.join('?' * len(tables))
+        found = dict(self._connection().execute(
+            f'SELECT name, version FROM versions WHERE name IN ({placeholders})', tuple(tables)
+        ))
+        return tuple(found.get(table, 0) for table in tables)
+
+    def bump(self, tables):
+        self._connection().executemany(
+            'INSERT INTO versions (name, version) VALUES (?, 1) '
+            'ON CONFLICT (name) DO UPDATE SET version = version + 1',
+            [(table,) for table in tables]
+        )
+
+    def get(self, key):
+        row = self._connection().execute('SELECT etag, headers, body FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(row[2], json.loads(row[1]), row[0])
+
+    def put(self, key, entry):
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO entries (key, etag, headers, body, stored_at) VALUES (?, ?, ?, ?, ?)',
+            (key, entry.etag, json.dumps(entry.headers), entry.body, time.time())
+        )
+        self._stores += 1
+        if self._stores % self.TRIM_EVERY == 0:
+            conn.execute('DELETE FROM entries WHERE key IN '
+                         '(SELECT key FROM entries ORDER BY stored_at DESC LIMIT -1 OFFSET ?)', (self.maxsize,))
+
+    def clear(self):
+        self._connection().execute('DELETE FROM entries')
+
+
+class ResponseCache:
+    """
+    Versioned response cache over a backend. namespace (e.g. the database URL)
+    keeps apps on different databases apart when they share a backend file.
+    """
+
+    def __init__(self, backend, namespace=''):
+        self.backend = backend
+        self.namespace = hashlib.sha256(namespace.encode()).hexdigest()[:12]
+
+    def key(self, request_key, tables):
+        """The cache key for a request reading tables: the request plus the tables' current versions."""
+        versions = self.backend.versions(self._names(tables))
+        return f"{self.namespace}|{request_key}|{'.'.join(str(version) for version in versions)}"
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    def put(self, key, body, headers):
+        entry = CachedResponse(body, headers)
+        self.backend.put(key, entry)
+        return entry
+
+    def invalidate(self, tables):
+        if tables:
+            self.backend.bump(self._names(sorted(tables)))
+
+    def _names(self, tables):
+        return [f"{self.namespace}|{table}" for table in tables]
+
+    def clear(self):
+        self.backend.clear()
+
+    def track_writes(self, engine, session):
+        """
+        Invalidate tables written through session once its transaction commits.
+        Every INSERT/UPDATE/DELETE (and COPY, see backends.copy_rows) on engine is
+        noted on its connection; the versions are bumped after the commit, so a
+        reader can never cache pre-commit data under the new version.
+        """
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def note_write(conn, cursor, statement, parameters, context, executemany):
+            match = WRITE_STATEMENT.match(statement)
+            if match:
+                conn.info.setdefault(_WRITTEN_TABLES, set()).add(match.group(1).lower())
+
+        @event.listens_for(session, 'after_begin')
+        def remember_connection(session, transaction, connection):
+            # Keep the DBAPI connection's info dict; the Connection itself is closed by commit time
+            session.info.setdefault(_CONNECTIONS, []).append(connection.info)
+
+        def written_tables(session):
+            tables = set()
+            for info in session.info.pop(_CONNECTIONS, []):
+                tables |= info.pop(_WRITTEN_TABLES, set())
+            return tables
+
+        @event.listens_for(session, 'after_commit')
+        def bump_versions(session):
+            self.invalidate(written_tables(session))
+
+        @event.listens_for(session, 'after_rollback')
+        def forget_writes(session):
+            written_tables(session)
@@ -0,0 +1,147 @@
+"""
+Full-text search for the COM569 Assignment Grading System
+
+Searches submission texts, criterion feedback (grades.feedback) and overall
+feedback (overall_grades.overall_feedback) inside the database, ranked by
+relevance, so instructors never pull whole classes into the browser to
+look for a term.
+
+    SQLite      - one FTS5 table, search_index, holding a copy of every
+                  non-empty text. Triggers on the three source tables keep it
+                  in step with every insert, update and delete (including
+                  cascades), so no write path has to remember it. Ranked by
+                  bm25; terms match in any order, and a trailing * matches a
+                  prefix.
+    PostgreSQL  - GIN indexes on to_tsvector('english', ...) of each column,
+                  which PostgreSQL keeps current itself. Ranked by ts_rank;
+                  queries use websearch syntax ("quoted phrases", -excluded).
+
+The migration in migrations.py creates either. Matches are highlighted with
+HIGHLIGHT in the snippet, which is otherwise the stored text unescaped.
+"""
+
+import re
+
+# (kind, table, primary key, text column, code); a search_index rowid is primary key * 4 + code
+SOURCES = [
+    ('submission', 'submissions', 'submission_id', 'submission_text', 1),
+    ('feedback', 'grades', 'grade_id', 'feedback', 2),
+    ('overall_feedback', 'overall_grades', 'overall_grade_id', 'overall_feedback', 3),
+]
+KINDS = [kind for kind, *_ in SOURCES]
+HIGHLIGHT = ('«', '»')
+SNIPPET_WORDS = 16
+
+_TERM = re.compile(r'[^\s"]+')
+
+
+# Each indexed text also carries "class<id> assignment<id>" in the scope column, so a class or
+# assignment filter is part of the FTS5 match itself rather than a join over every hit
+_SCOPE = {
+    'submissions': "(SELECT 'class' || a.class_id || ' assignment' || a.assignment_id FROM assignments a "
+                   "WHERE a.assignment_id = {row}.assignment_id)",
+    'grades': "(SELECT 'class' || a.class_id || ' assignment' || a.assignment_id FROM submissions s "
+              "JOIN assignments a ON a.assignment_id = s.assignment_id WHERE s.submission_id = {row}.submission_id)",
+}
+_SCOPE['overall_grades'] = _SCOPE['grades']
+
+
+def index_statements(dialect):
+    """DDL creating the search index for dialect and filling it from existing rows."""
+    if dialect == 'postgresql':
+        return [
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_search ON {table} "
+            f"USING gin (to_tsvector('english', coalesce({column}, '')))"
+            for _, table, _, column, _ in SOURCES
+        ]
+    if dialect != 'sqlite':
+        return []
+
+    statements = [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        "body, scope, kind UNINDEXED, submission_id UNINDEXED, tokenize = 'porter unicode61')",
+        # ORDER BY rank: bm25 on the text only, the scope column carries no weight
+        "INSERT INTO search_index (search_index, rank) VALUES ('rank', 'bm25(1.0, 0.0)')",
+    ]
+    for kind, table, key, column, code in SOURCES:
+        columns = "rowid, body, scope, kind, submission_id"
+        row = f"new.{key} * 4 + {code}, new.{column}, {_SCOPE[table].format(row='new')}, '{kind}', new.submission_id"
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} "
+            f"WHEN coalesce(new.{column}, '') != '' BEGIN "
+            f"INSERT INTO search_index ({columns}) VALUES ({row}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {column}, submission_id ON {table} "
+            f"BEGIN DELETE FROM search_index WHERE rowid = old.{key} * 4 + {code}; "
+            f"INSERT INTO search_index ({columns}) SELECT {row} WHERE coalesce(new.{column}, '') != ''; END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} "
+            f"BEGIN DELETE FROM search_index WHERE rowid = old.{key} * 4 + {code}; END",
+            f"INSERT INTO search_index ({columns}) "
+            f"SELECT {key} * 4 + {code}, {column}, {_SCOPE[table].format(row=table)}, '{kind}', submission_id "
+            f"FROM {table} WHERE coalesce({column}, '') != ''",
+        ]
+    return statements
+
+
+def fts5_query(text, class_id=None, assignment_id=None):
+    """
+    User input as an FTS5 query within a class or assignment: every term must match
+    the text, each quoted so FTS5 operators in the input are literal. None when the
+    input has no searchable term.
+    """
+    terms = []
+    for term in _TERM.findall(text):
+        if not re.search(r'\w', term):
+            continue
+        prefix = term.endswith('*') and len(term) > 1
+        terms.append('"' + term.rstrip('*') + '"' + ('*' if prefix else ''))
+    if not terms:
+        return None
+    scope = f'assignment{assignment_id}' if assignment_id else f'class{class_id}'
+    return f"scope : {scope} AND body : ({' '.join(terms)})"
+
+
+def search_statement(dialect, kinds, scope):
+    """
+    SQL returning kind, submission_id, assignment_id, student_id, assignment_title,
+    first_name, last_name, unique_id, snippet and score for the :query matches in
+    kinds, best first, :limit rows from :offset. On SQLite :query comes from
+    fts5_query() and already holds the class or assignment; on PostgreSQL scope is a
+    condition on s (submissions) and a (assignments). None when dialect has no
+    search index.
+    """
+    details = ("s.submission_id, s.assignment_id, s.student_id, a.title AS assignment_title, "
+               "u.first_name, u.last_name, u.unique_id")
+    joins = ("JOIN submissions s ON s.submission_id = hits.submission_id "
+             "JOIN assignments a ON a.assignment_id = s.assignment_id "
+             "LEFT JOIN users u ON u.user_id = s.student_id")
+    kind_list = ', '.join(f"'{kind}'" for kind in kinds)
+    start, end = HIGHLIGHT
+
+    if dialect == 'sqlite':
+        # ORDER BY rank lets FTS5 sort the matches itself, so snippet() only runs for the page
+        return (
+            f"SELECT hits.kind, {details}, hits.snippet, hits.score FROM ("
+            f"SELECT rowid, kind, submission_id, -rank AS score, "
+            f"snippet(search_index, 0, '{start}', '{end}', '…', {SNIPPET_WORDS}) AS snippet "
+            f"FROM search_index WHERE search_index MATCH :query AND kind IN ({kind_list}) "
+            f"ORDER BY rank LIMIT :limit OFFSET :offset) AS hits {joins} "
+            f"ORDER BY hits.score DESC, hits.rowid"
+        )
+    if dialect != 'postgresql':
+        return None
+
+    branches = ' UNION ALL '.join(
+        f"SELECT '{kind}' AS kind, {key} * 4 + {code} AS hit_id, submission_id, {column} AS body "
+        f"FROM {table}, q WHERE to_tsvector('english', coalesce({column}, '')) @@ q.query"
+        for kind, table, key, column, code in SOURCES if kind in kinds
+    )
+    return (
+        f"WITH q AS (SELECT websearch_to_tsquery('english', :query) AS query) "
+        f"SELECT hits.kind, {details}, "
+        f"ts_headline('english', hits.body, q.query, "
+        f"'StartSel={start}, StopSel={end}, MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}') AS snippet, "
+        f"ts_rank(to_tsvector('english', coalesce(hits.body, '')), q.query) AS score "
+        f"FROM ({branches}) AS hits CROSS JOIN q {joins} "
+        f"WHERE {scope} "
+        f"ORDER BY score DESC, hits.hit_id LIMIT :limit OFFSET :offset"
+    )
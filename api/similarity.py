@@ -0,0 +1,108 @@
+"""
+Near-duplicate submission detection for the COM569 Assignment Grading System
+
+Each submission text is reduced to its set of SHINGLE_WORDS-word shingles and
+summarised by a MinHash signature: for NUM_PERM random hash functions, the
+smallest hash of any shingle. Two signatures agree in a given position with
+probability equal to the Jaccard similarity of the shingle sets, so the
+fraction of equal positions estimates it without the texts.
+
+Signatures are split into BANDS bands of ROWS values (locality-sensitive
+hashing) and each band is hashed to a bucket. Submissions sharing a bucket
+in any band are candidate pairs; only those are compared, so finding the
+near-duplicates of an assignment costs a lookup per band instead of a
+comparison per pair. With 32 bands of 4 rows a pair with Jaccard similarity
+0.5 becomes a candidate 87% of the time, 0.6 99% and 0.8 all but certainly.
+"""
+
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+SHINGLE_WORDS = 3
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+# Shorter texts ("see attached file") are not indexed, or every submission of boilerplate would cluster
+MIN_WORDS = 10
+PRIME = (1 << 31) - 1
+
+WORD = re.compile(r'\w+')
+
+
+def _parameter(i, j):
+    # Fixed per position, so signatures stored by one version compare with the next
+    digest = hashlib.blake2b(f'minhash-{i}-{j}'.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') % (PRIME - 1) + 1
+
+
+# The NUM_PERM hash functions are x -> (a * x + b) mod PRIME; both operands are below 2^31
+# so the product fits in 64 bits
+_A = np.array([_parameter(i, 0) for i in range(NUM_PERM)], dtype=np.uint64)
+_B = np.array([_parameter(i, 1) for i in range(NUM_PERM)], dtype=np.uint64)
+
+
+def shingles(text):
+    """The set of SHINGLE_WORDS-word sequences in text, case and punctuation ignored."""
+    words = WORD.findall((text or '').lower())
+    return {' '.join(words[i:i + SHINGLE_WORDS]) for i in range(max(len(words) - SHINGLE_WORDS + 1, 0))}
+
+
+def minhash(text):
+    """MinHash signature of text (NUM_PERM uint32 values), or None if it has fewer than MIN_WORDS words."""
+    if len(WORD.findall(text or '')) < MIN_WORDS:
+        return None
+    found = shingles(text)
+    hashes = np.fromiter((zlib.crc32(shingle.encode()) for shingle in found), dtype=np.uint64, count=len(found))
+    hashes %= PRIME
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % PRIME).min(axis=1).astype(np.uint32)
+
+
+def lsh_buckets(signature):
+    """The bucket of each of the BANDS bands of signature, as signed 64-bit ints (a BIGINT column)."""
+    data = signature.astype('<u4').tobytes()
+    width = ROWS * 4
+    return [int.from_bytes(hashlib.blake2b(data[band * width:(band + 1) * width], digest_size=8).digest(),
+                           'little', signed=True)
+            for band in range(BANDS)]
+
+
+def signature_to_bytes(signature):
+    return signature.astype('<u4').tobytes()
+
+
+def signature_from_bytes(data):
+    return np.frombuffer(data, dtype='<u4')
+
+
+def estimate_similarities(signatures, pairs):
+    """Estimated Jaccard similarity of each (i, j) pair of indexes into the signatures list."""
+    if not len(pairs):
+        return np.zeros(0)
+    signatures = np.asarray(signatures)
+    pairs = np.asarray(pairs)
+    return (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+
+
+def cluster_pairs(pairs):
+    """Group the ids linked by pairs into connected components (union-find), largest first."""
+    parent = {}
+
+    def root(item):
+        parent.setdefault(item, item)
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    for a, b in pairs:
+        ra, rb = root(a), root(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+
+    groups = {}
+    for item in parent:
+        groups.setdefault(root(item), []).append(item)
+    return sorted((sorted(group) for group in groups.values()), key=lambda group: (-len(group), group[0]))
@@ -0,0 +1,137 @@
+import itertools
+import os
+import secrets
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api')
+
+
+@pytest.fixture(scope='session')
+def api(tmp_path_factory):
+    """
+    The app module on a fresh SQLite database, or on DATABASE_URL when it is set (as in the
+    PostgreSQL CI job), with the response cache off so every request hits the database.
+    """
+    directory = tmp_path_factory.mktemp('api')
+    os.environ.setdefault('DATABASE_URL', f"sqlite:///{directory / 'grading_system.db'}")
+    os.environ.update({
+        'RESPONSE_CACHE': 'off',
+        'EVENT_LOG': 'memory',
+        'HASH_WORKERS': '0',
+        'JOB_ARTIFACT_PATH': str(directory / 'job_artifacts'),
+        # Signs tokens with the development key; every call needs one, as in production
+        'TESTING': 'True',
+        'AUTH_REQUIRED': 'True',
+    })
+    sys.path.insert(0, API_DIR)
+    import app as api
+
+    with api.app.app_context():
+        api.db.create_all()
+        api.upgrade_database(api.db.engine)
+    return api
+
+
+@pytest.fixture
+def client(api):
+    with api.app.app_context():
+        yield api.app.test_client()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __len__(self):
+        return len(self.statements)
+
+
+@pytest.fixture
+def count_queries(api):
+    """count_queries() -> a context manager collecting the SQL statements run inside it."""
+    @contextmanager
+    def counting():
+        counter = QueryCounter()
+        event.listen(api.db.engine, 'before_cursor_execute', counter)
+        try:
+            yield counter
+        finally:
+            event.remove(api.db.engine, 'before_cursor_execute', counter)
+
+    return counting
+
+
+class Factory:
+    """
+    Creates committed rows and returns their ids. Codes, emails and unique IDs
+    carry a per-run prefix, so tests can share a database that already has data.
+    """
+
+    def __init__(self, api):
+        self.api = api
+        self.prefix = secrets.token_hex(3)
+        self.serial = itertools.count(1)
+
+    def _add(self, row):
+        self.api.db.session.add(row)
+        self.api.db.session.flush()
+        return row
+
+    def user(self, role='student'):
+        n = next(self.serial)
+        user = self._add(self.api.User(
+            unique_id=f't{self.prefix}{n:06d}', email=f'{role}{n}.{self.prefix}@test', password_hash='x',
+            first_name='Test', last_name=f'{role.title()} {n}', role=role
+        ))
+        self.api.db.session.commit()
+        return user.user_id
+
+    def class_(self, instructor_id=None, students=0):
+        """(class_id, [student ids]) of a new class with that many new students enrolled."""
+        instructor_id = instructor_id or self.user('instructor')
+        class_obj = self._add(self.api.Class(instructor_id=instructor_id, class_code=f'T{self.prefix}{next(self.serial)}',
+                                             class_name='Test class'))
+        class_id = class_obj.class_id
+        student_ids = [self.user() for _ in range(students)]
+        for student_id in student_ids:
+            self._add(self.api.Enrollment(class_id=class_id, student_id=student_id))
+        self.api.db.session.commit()
+        return class_id, student_ids
+
+    def assignment(self, class_id, criteria=(), max_points=100, due_in=timedelta(days=7)):
+        """(assignment_id, [rubric ids]) of a new assignment, with its stats row and one criterion per max_points in criteria."""
+        instructor_id = self.api.db.session.get(self.api.Class, class_id).instructor_id
+        assignment = self._add(self.api.Assignment(
+            class_id=class_id, instructor_id=instructor_id, title=f'Assignment {next(self.serial)}',
+            description='', due_date=datetime.utcnow() + due_in, max_points=max_points
+        ))
+        assignment_id = assignment.assignment_id
+        self._add(self.api.AssignmentStats(assignment_id=assignment_id))
+        rubric_ids = [self._add(self.api.Rubric(assignment_id=assignment_id, criterion_name=f'Criterion {i + 1}',
+                                                max_points=points)).rubric_id
+                      for i, points in enumerate(criteria)]
+        self.api.db.session.commit()
+        return assignment_id, rubric_ids
+
+    def submission(self, assignment_id, student_id, text='A test submission', status='submitted'):
+        submission = self._add(self.api.Submission(assignment_id=assignment_id, student_id=student_id,
+                                                   submission_text=text, file_path='', status=status))
+        self.api.db.session.commit()
+        return submission.submission_id
+
+    def headers(self, user_id):
+        """Authorization header with a token for user_id."""
+        return {'Authorization': f'Bearer {self.api.token_signer.issue(user_id)}'}
+
+
+@pytest.fixture
+def make(api, client):
+    return Factory(api)
@@ -0,0 +1,94 @@
+"""Grade analytics: the statistics themselves and what the endpoints report for a graded assignment."""
+
+import numpy as np
+import pytest
+
+
+def test_summarize_matches_numpy_per_group(api):
+    rng = np.random.default_rng(7)
+    values = rng.uniform(0, 20, 200).round(1)
+    groups = rng.integers(1, 4, 200)
+
+    summaries = api.summarize(groups, values, {1: 20, 2: 20, 3: 20})
+
+    assert sorted(summaries) == [1, 2, 3]
+    for key, summary in summaries.items():
+        group = values[groups == key]
+        assert summary['count'] == len(group)
+        assert summary['mean'] == round(group.mean(), 2)
+        assert summary['median'] == round(float(np.median(group)), 2)
+        assert summary['std'] == round(group.std(), 2)
+        assert (summary['min'], summary['max']) == (group.min(), group.max())
+        assert summary['percentiles'] == {f'p{q}': round(float(np.percentile(group, q)), 2) for q in (10, 25, 50, 75, 90)}
+        assert summary['histogram'] == np.histogram(np.minimum(group / 20 * 100, 99.99), bins=10, range=(0, 100))[0].tolist()
+
+
+def test_extra_credit_counts_in_the_top_bin_and_groups_without_max_points_get_no_histogram(api):
+    summaries = api.summarize([1, 1, 2], [12, 10, 5], {1: 10})
+
+    assert summaries[1]['histogram'] == [0] * 9 + [2]
+    assert summaries[1]['mean_percent'] == 110.0
+    assert summaries[2]['histogram'] is None
+    assert summaries[2]['mean_percent'] is None
+
+
+def test_no_scores(api):
+    assert api.summarize([], []) == {}
+    assert api.distribution([]) == {'count': 0}
+
+
+@pytest.fixture
+def graded_assignment(api, client, make):
+    """(instructor headers, class id, assignment id, rubric ids): four students graded 70, 100, 30 and 50 of 100."""
+    class_id, students = make.class_(students=5)
+    instructor_id = api.db.session.get(api.Class, class_id).instructor_id
+    assignment_id, rubric_ids = make.assignment(class_id, criteria=(50, 50))
+    points = [(40, 30), (50, 50), (10, 20), (25, 25)]
+    # The fifth student submitted but isn't graded, so doesn't count
+    submission_ids = [make.submission(assignment_id, student_id) for student_id in students]
+    headers = make.headers(instructor_id)
+    response = client.post('/api/grades/batch', headers=headers, json={'submissions': [
+        {'submission_id': submission_id,
+         'grades': [{'rubric_id': rubric_id, 'points_earned': p} for rubric_id, p in zip(rubric_ids, pair)]}
+        for submission_id, pair in zip(submission_ids, points)
+    ]})
+    assert response.status_code == 201
+    return headers, class_id, assignment_id, rubric_ids
+
+
+def test_assignment_analytics(client, graded_assignment):
+    headers, _, assignment_id, (first, second) = graded_assignment
+
+    response = client.get(f'/api/assignments/{assignment_id}/analytics', headers=headers)
+
+    assert response.status_code == 200
+    scores = response.json['scores']
+    assert (scores['count'], scores['mean'], scores['median'], scores['std']) == (4, 62.5, 60.0, 25.86)
+    assert (scores['min'], scores['max'], scores['mean_percent']) == (30.0, 100.0, 62.5)
+    assert scores['histogram'] == [0, 0, 0, 1, 0, 1, 0, 1, 0, 1]
+    criteria = {c['rubric_id']: c for c in response.json['criteria']}
+    assert (criteria[first]['mean'], criteria[first]['mean_percent']) == (31.25, 62.5)
+    assert (criteria[second]['min'], criteria[second]['max']) == (20.0, 50.0)
+    assert response.json['histogram_edges'] == [float(edge) for edge in range(0, 101, 10)]
+
+
+def test_class_analytics_adds_the_student_totals(client, make, graded_assignment):
+    headers, class_id, _, _ = graded_assignment
+    make.assignment(class_id, max_points=100)
+
+    response = client.get(f'/api/classes/{class_id}/analytics', headers=headers)
+
+    assert response.status_code == 200
+    assert response.json['max_points'] == 200
+    students = response.json['students']
+    assert (students['count'], students['mean'], students['min'], students['max']) == (4, 31.25, 15.0, 50.0)
+    assert [a['scores']['count'] for a in response.json['assignments']] == [4, 0]
+
+
+def test_students_cannot_see_analytics(api, client, make, graded_assignment):
+    _, class_id, assignment_id, _ = graded_assignment
+    student_id = api.Enrollment.query.filter_by(class_id=class_id).first().student_id
+
+    response = client.get(f'/api/assignments/{assignment_id}/analytics', headers=make.headers(student_id))
+
+    assert response.status_code == 403
@@ -0,0 +1,74 @@
+"""The assignment_stats counters the submission and grading write paths keep current."""
+
+from datetime import timedelta
+
+from sqlalchemy import event, text
+
+
+def stats(api, assignment_id):
+    api.db.session.expire_all()
+    row = api.db.session.get(api.AssignmentStats, assignment_id)
+    return row and (row.submitted_count, row.graded_count, row.late_count)
+
+
+def submit(client, make, assignment_id, student_id):
+    response = client.post('/api/submissions', headers=make.headers(student_id),
+                           json={'assignment_id': assignment_id, 'submission_text': 'My answer'})
+    assert response.status_code == 201
+    return response.json['submission_id']
+
+
+def test_counters_follow_submissions_grades_and_deletes(api, client, make):
+    class_id, students = make.class_(students=3)
+    instructor_id = api.db.session.get(api.Class, class_id).instructor_id
+    assignment_id, _ = make.assignment(class_id, due_in=timedelta(days=-1))
+    assert stats(api, assignment_id) == (0, 0, 0)
+
+    submission_ids = [submit(client, make, assignment_id, student_id) for student_id in students]
+    assert stats(api, assignment_id) == (3, 0, 3)
+
+    response = client.post('/api/grades', headers=make.headers(instructor_id),
+                           json={'submission_id': submission_ids[0], 'points_earned': 80})
+    assert response.status_code == 201
+    assert stats(api, assignment_id) == (3, 1, 3)
+
+    response = client.delete(f'/api/submissions/{submission_ids[1]}', headers=make.headers(students[1]))
+    assert response.status_code == 200
+    assert stats(api, assignment_id) == (2, 1, 2)
+
+
+def test_a_missing_row_is_rebuilt_from_a_full_count(api, client, make):
+    class_id, (first, second) = make.class_(students=2)
+    assignment_id, _ = make.assignment(class_id)
+    submit(client, make, assignment_id, first)
+    api.db.session.execute(text("DELETE FROM assignment_stats WHERE assignment_id = :id"), {'id': assignment_id})
+    api.db.session.commit()
+
+    submit(client, make, assignment_id, second)
+
+    assert stats(api, assignment_id) == (2, 0, 0)
+
+
+def test_a_row_created_by_a_concurrent_writer_gets_the_deltas(api, client, make):
+    class_id, (student_id,) = make.class_(students=1)
+    assignment_id, _ = make.assignment(class_id)
+    api.db.session.execute(text("DELETE FROM assignment_stats WHERE assignment_id = :id"), {'id': assignment_id})
+    api.db.session.commit()
+
+    inserted = []
+
+    def insert_after_the_update(conn, cursor, statement, parameters, context, executemany):
+        # Another writer creates the row between this one's UPDATE (no row) and its INSERT
+        if not inserted and statement.startswith('UPDATE assignment_stats') and cursor.rowcount == 0:
+            inserted.append(assignment_id)
+            conn.execute(text("INSERT INTO assignment_stats (assignment_id, submitted_count, graded_count, "
+                              "late_count) VALUES (:id, 5, 2, 1)"), {'id': assignment_id})
+
+    event.listen(api.db.engine, 'after_cursor_execute', insert_after_the_update)
+    try:
+        submit(client, make, assignment_id, student_id)
+    finally:
+        event.remove(api.db.engine, 'after_cursor_execute', insert_after_the_update)
+
+    assert inserted
+    assert stats(api, assignment_id) == (6, 2, 1)
@@ -0,0 +1,78 @@
+"""Creating an assignment with its rubric: criteria are validated and everything is committed together."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def new_assignment(api, make):
+    """(instructor headers, payload for POST /api/assignments with two criteria)."""
+    class_id, _ = make.class_()
+    instructor_id = api.db.session.get(api.Class, class_id).instructor_id
+    return make.headers(instructor_id), {
+        'class_id': class_id, 'instructor_id': instructor_id, 'title': f'Essay {make.prefix}',
+        'due_date': (datetime.utcnow() + timedelta(days=7)).isoformat(), 'max_points': 100,
+        'rubrics': [{'criterion_name': 'Argument', 'max_points': 60}, {'criterion_name': 'Style', 'max_points': 40.5}],
+    }
+
+
+def created(api, payload):
+    api.db.session.expire_all()
+    return api.Assignment.query.filter_by(class_id=payload['class_id'], title=payload['title']).all()
+
+
+def test_assignment_is_created_with_its_criteria_and_stats(api, client, new_assignment):
+    headers, payload = new_assignment
+
+    response = client.post('/api/assignments', headers=headers, json=payload)
+
+    assert response.status_code == 201
+    (assignment,) = created(api, payload)
+    assert assignment.assignment_id == response.json['assignment_id']
+    criteria = api.Rubric.query.filter_by(assignment_id=assignment.assignment_id).order_by(api.Rubric.rubric_id)
+    assert [(c.criterion_name, c.max_points) for c in criteria] == [('Argument', 60), ('Style', 40.5)]
+    assert api.db.session.get(api.AssignmentStats, assignment.assignment_id) is not None
+
+
+@pytest.mark.parametrize('rubrics', [
+    'Argument',
+    [{'max_points': 10}],
+    [{'criterion_name': 'Argument', 'max_points': '10'}],
+    [{'criterion_name': 'Argument', 'max_points': True}],
+    [{'criterion_name': 'Argument', 'max_points': 10}, 'Style'],
+])
+def test_invalid_criteria_are_rejected_before_anything_is_written(api, client, new_assignment, rubrics):
+    headers, payload = new_assignment
+
+    response = client.post('/api/assignments', headers=headers, json=dict(payload, rubrics=rubrics))
+
+    assert response.status_code == 400
+    assert created(api, payload) == []
+
+
+def test_a_missing_rubric_source_creates_nothing(api, client, new_assignment):
+    headers, payload = new_assignment
+
+    response = client.post('/api/assignments', headers=headers, json=dict(payload, rubric_from_assignment_id=0))
+
+    assert response.status_code == 404
+    assert created(api, payload) == []
+
+
+def test_a_failed_criterion_insert_rolls_back_the_assignment(api, client, new_assignment, monkeypatch):
+    headers, payload = new_assignment
+
+    def failing_copy_rows(conn, table, rows):
+        raise RuntimeError('rubric insert failed')
+
+    monkeypatch.setattr(api, 'copy_rows', failing_copy_rows)
+    with pytest.raises(RuntimeError):
+        client.post('/api/assignments', headers=headers, json=payload)
+
+    # The flushed assignment is still in the test's session (the request's would be torn down); nothing was committed
+    assignments = api.Assignment.__table__
+    with api.db.engine.connect() as conn:
+        committed = conn.execute(assignments.select().where(assignments.c.class_id == payload['class_id'])).all()
+    api.db.session.rollback()
+    assert committed == []
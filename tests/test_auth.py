@@ -0,0 +1,38 @@
+"""Bearer tokens: required by default, and neither issued nor accepted without a secret key."""
+
+import pytest
+
+
+@pytest.fixture
+def no_secret_key(api, monkeypatch):
+    monkeypatch.setattr(api, 'token_signer', api.TokenSigner(None, 60))
+
+
+def test_anonymous_calls_are_rejected_by_default(client):
+    assert client.get('/api/classes').status_code == 401
+    assert client.get('/api/health').status_code == 200
+
+
+def test_tokens_signed_with_another_key_are_rejected(api, client, make):
+    forged = api.TokenSigner('not-the-secret', 60).issue(make.user('instructor'))
+
+    response = client.get('/api/classes', headers={'Authorization': f'Bearer {forged}'})
+
+    assert response.status_code == 401
+
+
+def test_register_is_unavailable_without_a_secret_key(api, client, no_secret_key):
+    response = client.post('/api/auth/register', json={
+        'email': 'nokey@test', 'password': 'password', 'first_name': 'No', 'last_name': 'Key', 'role': 'student'
+    })
+
+    assert response.status_code == 503
+    assert api.User.query.filter_by(email='nokey@test').first() is None
+
+
+def test_bearer_tokens_are_refused_without_a_secret_key(api, client, make, monkeypatch):
+    headers = make.headers(make.user('instructor'))
+    monkeypatch.setattr(api, 'token_signer', api.TokenSigner(None, 60))
+
+    assert client.get('/api/classes', headers=headers).status_code == 503
+    assert client.post('/api/auth/login', json={'email': 'x@test', 'password': 'x'}).status_code == 503
@@ -0,0 +1,35 @@
+"""Bulk loading and INSERT ... ON CONFLICT on whichever backend DATABASE_URL points at."""
+
+
+def test_copy_rows_loads_every_row_and_fills_defaults(api, make):
+    users = api.User.__table__
+    emails = [f'copied{i}.{make.prefix}@test' for i in range(3)]
+    rows = [{'unique_id': f'c{make.prefix}{i:04d}', 'email': email, 'password_hash': 'x',
+             'first_name': 'Copied', 'last_name': f'User {i}', 'role': 'student'} for i, email in enumerate(emails)]
+
+    with api.db.engine.begin() as conn:
+        assert api.copy_rows(conn, users, rows) == 3
+        assert api.copy_rows(conn, users, []) == 0
+        copied = conn.execute(users.select().where(users.c.email.in_(emails)).order_by(users.c.email)).all()
+
+    assert [row.email for row in copied] == emails
+    assert all(row.created_at is not None for row in copied)
+
+
+def test_upsert_insert_updates_the_existing_row(api, make):
+    class_id, _ = make.class_()
+    assignment_id, _ = make.assignment(class_id)
+    stats = api.AssignmentStats.__table__
+
+    with api.db.engine.begin() as conn:
+        conn.execute(stats.delete().where(stats.c.assignment_id == assignment_id))
+        for submitted in (2, 3):
+            statement = api.upsert_insert(conn, stats).values(
+                assignment_id=assignment_id, submitted_count=submitted, graded_count=0, late_count=0)
+            conn.execute(statement.on_conflict_do_update(
+                index_elements=[stats.c.assignment_id],
+                set_={'submitted_count': stats.c.submitted_count + statement.excluded.submitted_count}
+            ))
+        counts = conn.execute(stats.select().where(stats.c.assignment_id == assignment_id)).all()
+
+    assert [row.submitted_count for row in counts] == [5]
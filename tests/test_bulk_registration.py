@@ -0,0 +1,43 @@
+"""Bulk registration: per-row statuses, and a 400 when no row could be created."""
+
+import pytest
+
+
+@pytest.fixture
+def instructor(api, make):
+    """(headers, class id) of an instructor with an empty class."""
+    class_id, _ = make.class_()
+    return make.headers(api.db.session.get(api.Class, class_id).instructor_id), class_id
+
+
+def test_rows_are_created_and_enrolled(api, client, make, instructor):
+    headers, class_id = instructor
+    existing = api.db.session.get(api.User, make.user())
+    users = [{'email': f'bulk1.{make.prefix}@test', 'first_name': 'Bulk', 'last_name': 'One'},
+             {'email': f'bulk1.{make.prefix}@test', 'first_name': 'Bulk', 'last_name': 'Again'},
+             {'email': existing.email, 'first_name': 'Already', 'last_name': 'Here'},
+             {'email': f'bulk2.{make.prefix}@test', 'first_name': 'Bulk'}]
+
+    response = client.post('/api/auth/register/bulk', headers=headers, json={'users': users, 'class_id': class_id})
+
+    assert response.status_code == 201
+    assert [row['status'] for row in response.json['rows']] == ['created', 'duplicate', 'exists', 'invalid']
+    assert response.json['rows'][0]['temporary_password']
+    assert response.json['enrollment']['enrolled'] == 2
+    enrolled = {row.student_id for row in api.Enrollment.query.filter_by(class_id=class_id)}
+    assert enrolled == {response.json['rows'][0]['user_id'], existing.user_id}
+
+
+def test_nothing_created_is_a_400_and_writes_nothing(api, client, make, instructor):
+    headers, class_id = instructor
+    existing = api.db.session.get(api.User, make.user())
+    users = [{'email': existing.email, 'first_name': 'Already', 'last_name': 'Here'},
+             {'email': '', 'first_name': 'No', 'last_name': 'Email'},
+             {'email': f'teacher.{make.prefix}@test', 'first_name': 'A', 'last_name': 'B', 'role': 'instructor'}]
+
+    response = client.post('/api/auth/register/bulk', headers=headers, json={'users': users, 'class_id': class_id})
+
+    assert response.status_code == 400
+    assert response.json['summary'] == {'created': 0, 'exists': 1, 'duplicate': 0, 'invalid': 2}
+    assert api.Enrollment.query.filter_by(class_id=class_id).count() == 0
+    assert api.User.query.filter_by(email=f'teacher.{make.prefix}@test').first() is None
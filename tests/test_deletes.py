@@ -0,0 +1,96 @@
+"""Deleting a class or assignment removes every row under it, in the app and in the database."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+ESSAY = ' '.join(f'word{i}' for i in range(200))
+
+
+@pytest.fixture
+def populated_class(api, client, make):
+    """(instructor headers, class id, assignment id, student ids) with graded, signed submissions."""
+    class_id, students = make.class_(students=2)
+    instructor_id = api.db.session.get(api.Class, class_id).instructor_id
+    assignment_id, rubric_ids = make.assignment(class_id, criteria=(10, 10))
+    submission_ids = []
+    for student_id in students:
+        response = client.post('/api/submissions', headers=make.headers(student_id),
+                               json={'assignment_id': assignment_id, 'submission_text': ESSAY})
+        submission_ids.append(response.json['submission_id'])
+    response = client.post('/api/grades/batch', headers=make.headers(instructor_id), json={'submissions': [
+        {'submission_id': submission_id, 'grades': [{'rubric_id': rubric_id, 'points_earned': 5} for rubric_id in rubric_ids]}
+        for submission_id in submission_ids
+    ]})
+    assert response.status_code == 201
+    return make.headers(instructor_id), class_id, assignment_id, students
+
+
+def remaining(api, class_id, assignment_id):
+    """Rows left per table under class_id / assignment_id."""
+    api.db.session.expire_all()
+    queries = {
+        'classes': "SELECT COUNT(*) FROM classes WHERE class_id = :c",
+        'enrollments': "SELECT COUNT(*) FROM enrollments WHERE class_id = :c",
+        'assignments': "SELECT COUNT(*) FROM assignments WHERE assignment_id = :a",
+        'assignment_stats': "SELECT COUNT(*) FROM assignment_stats WHERE assignment_id = :a",
+        'rubrics': "SELECT COUNT(*) FROM rubrics WHERE assignment_id = :a",
+        'submissions': "SELECT COUNT(*) FROM submissions WHERE assignment_id = :a",
+        'submission_signatures': "SELECT COUNT(*) FROM submission_signatures WHERE assignment_id = :a",
+        'similarity_buckets': "SELECT COUNT(*) FROM similarity_buckets WHERE assignment_id = :a",
+        'grades': "SELECT COUNT(*) FROM grades g JOIN rubrics r ON r.rubric_id = g.rubric_id WHERE r.assignment_id = :a",
+        'overall_grades': "SELECT COUNT(*) FROM overall_grades o JOIN submissions s ON s.submission_id = o.submission_id "
+                          "WHERE s.assignment_id = :a",
+    }
+    return {table: api.db.session.execute(text(sql), {'c': class_id, 'a': assignment_id}).scalar()
+            for table, sql in queries.items()}
+
+
+def test_deleting_a_class_removes_everything_under_it(api, client, make, populated_class):
+    headers, class_id, assignment_id, students = populated_class
+    other_class, _ = make.class_(students=1)
+    other_assignment, _ = make.assignment(other_class, criteria=(10,))
+    before = remaining(api, class_id, assignment_id)
+    assert all(before.values())
+
+    response = client.delete(f'/api/classes/{class_id}', headers=headers)
+
+    assert response.status_code == 200
+    assert {table: response.json['deleted'][table] for table in before} == before
+    assert not any(remaining(api, class_id, assignment_id).values())
+    assert remaining(api, other_class, other_assignment)['rubrics'] == 1
+    assert all(api.db.session.get(api.User, student_id) for student_id in students)
+
+
+def test_deleting_an_assignment_keeps_the_class(api, client, populated_class):
+    headers, class_id, assignment_id, _ = populated_class
+
+    response = client.delete(f'/api/assignments/{assignment_id}', headers=headers)
+
+    assert response.status_code == 200
+    left = remaining(api, class_id, assignment_id)
+    assert (left.pop('classes'), left.pop('enrollments')) == (1, 2)
+    assert not any(left.values())
+
+
+def test_the_database_cascades_deletes_itself(api, populated_class):
+    _, class_id, assignment_id, _ = populated_class
+
+    api.db.session.execute(text("DELETE FROM classes WHERE class_id = :c"), {'c': class_id})
+    api.db.session.commit()
+
+    assert not any(remaining(api, class_id, assignment_id).values())
+
+
+def test_finished_classes_are_those_with_every_assignment_past_the_cutoff(api, make):
+    finished, _ = make.class_()
+    make.assignment(finished, due_in=timedelta(days=-30))
+    current, _ = make.class_()
+    make.assignment(current, due_in=timedelta(days=-30))
+    make.assignment(current, due_in=timedelta(days=30))
+
+    finished_ids = api.finished_class_ids(datetime.utcnow())
+
+    assert finished in finished_ids
+    assert current not in finished_ids
@@ -0,0 +1,49 @@
+"""The CSV exports stream their rows instead of building the file in memory."""
+
+import csv
+import io
+
+import pytest
+
+
+@pytest.fixture
+def graded_class(api, client, make):
+    """(instructor headers, class id, assignment id) with two students, one graded 40 + 35 on two criteria."""
+    class_id, (graded_student, _) = make.class_(students=2)
+    instructor_id = api.db.session.get(api.Class, class_id).instructor_id
+    assignment_id, (first, second) = make.assignment(class_id, criteria=(50, 50))
+    submission_id = make.submission(assignment_id, graded_student)
+    headers = make.headers(instructor_id)
+    response = client.post('/api/grades/batch', headers=headers, json={'submissions': [{
+        'submission_id': submission_id,
+        'grades': [{'rubric_id': first, 'points_earned': 40}, {'rubric_id': second, 'points_earned': 35}]
+    }]})
+    assert response.status_code == 201
+    return headers, class_id, assignment_id
+
+
+def read_csv(response):
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert response.is_streamed
+    assert 'Content-Length' not in response.headers
+    return list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+
+
+def test_assignment_export_streams_the_graded_submissions(client, graded_class):
+    headers, _, assignment_id = graded_class
+
+    header, *rows = read_csv(client.get(f'/api/grades/export/{assignment_id}', headers=headers))
+
+    assert header[3:6] == ['Total Points', 'Max Points', 'Percentage']
+    assert [row[3:6] for row in rows] == [['75.0', '100.0', '75.0%']]
+
+
+def test_gradebook_export_has_a_row_per_student_and_criterion_columns(client, graded_class):
+    headers, class_id, _ = graded_class
+
+    header, *rows = read_csv(client.get(f'/api/grades/export/class/{class_id}?criteria=1', headers=headers))
+
+    assert len(header) == 3 + 3 + 3
+    assert len(rows) == 2
+    assert sorted(row[3:6] for row in rows) == sorted([['75.0', '40.0', '35.0'], ['', '', '']])
@@ -0,0 +1,110 @@
+"""Criterion grades, regrades and the overall totals the batch endpoint stores."""
+
+import pytest
+
+
+@pytest.fixture
+def graded_setup(make):
+    """(instructor headers, submission id, rubric ids) for a submission to a two-criterion, 100-point assignment."""
+    class_id, (student_id,) = make.class_(students=1)
+    assignment_id, rubric_ids = make.assignment(class_id, criteria=(50, 50))
+    instructor_id = make.api.db.session.get(make.api.Class, class_id).instructor_id
+    submission_id = make.submission(assignment_id, student_id)
+    return make.headers(instructor_id), submission_id, rubric_ids
+
+
+def stored_grades(api, submission_id):
+    return sorted((grade.rubric_id or 0, grade.points_earned)
+                  for grade in api.Grade.query.filter_by(submission_id=submission_id))
+
+
+def overall_total(api, submission_id):
+    api.db.session.expire_all()
+    return api.OverallGrade.query.filter_by(submission_id=submission_id).one().total_points
+
+
+def batch(client, headers, submission_id, grades):
+    return client.post('/api/grades/batch', headers=headers,
+                       json={'submissions': [{'submission_id': submission_id, 'grades': grades}]})
+
+
+def test_regrade_updates_the_criterion_in_place(api, client, graded_setup):
+    headers, submission_id, (rubric_id, _) = graded_setup
+    for points in (10, 20):
+        response = client.post('/api/grades', headers=headers,
+                               json={'submission_id': submission_id, 'rubric_id': rubric_id, 'points_earned': points})
+        assert response.status_code == 201
+    for points in (5, 7):
+        response = client.post('/api/grades', headers=headers,
+                               json={'submission_id': submission_id, 'points_earned': points})
+        assert response.status_code == 201
+
+    assert stored_grades(api, submission_id) == [(0, 7), (rubric_id, 20)]
+
+
+def test_batch_total_sums_the_stored_criteria(api, client, graded_setup):
+    headers, submission_id, (first, second) = graded_setup
+    assert batch(client, headers, submission_id, [{'rubric_id': first, 'points_earned': 40}]).status_code == 201
+    response = batch(client, headers, submission_id, [{'rubric_id': second, 'points_earned': 30}])
+
+    assert response.status_code == 201
+    assert response.json['submissions'] == [{'submission_id': submission_id, 'total_points': 70}]
+    assert overall_total(api, submission_id) == 70
+
+
+def test_batch_total_without_criteria_is_the_overall_grade(api, client, make):
+    class_id, (student_id,) = make.class_(students=1)
+    assignment_id, _ = make.assignment(class_id)
+    instructor_id = api.db.session.get(api.Class, class_id).instructor_id
+    submission_id = make.submission(assignment_id, student_id)
+
+    response = batch(client, make.headers(instructor_id), submission_id, [{'rubric_id': None, 'points_earned': 90}])
+
+    assert response.status_code == 201
+    assert overall_total(api, submission_id) == 90
+
+
+def test_overall_grade_does_not_add_to_the_criteria(api, client, graded_setup):
+    headers, submission_id, (first, second) = graded_setup
+    batch(client, headers, submission_id, [{'rubric_id': first, 'points_earned': 40},
+                                           {'rubric_id': second, 'points_earned': 40}])
+    response = batch(client, headers, submission_id, [{'rubric_id': None, 'points_earned': 90}])
+
+    assert response.status_code == 201
+    assert overall_total(api, submission_id) == 80
+
+
+@pytest.mark.parametrize('payload', [
+    [1],
+    {'submissions': 'abc'},
+    {'submissions': [{}]},
+    {'submissions': [{'submission_id': 1, 'grades': [{'rubric_id': None}]}]},
+    {'submissions': [{'submission_id': 1, 'grades': [{'points_earned': '10'}]}]},
+])
+def test_batch_rejects_malformed_payloads(client, graded_setup, payload):
+    headers, _, _ = graded_setup
+    response = client.post('/api/grades/batch', headers=headers, json=payload)
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('points', [-1, 51])
+def test_batch_rejects_points_outside_the_criterion(api, client, graded_setup, points):
+    headers, submission_id, (rubric_id, _) = graded_setup
+    response = batch(client, headers, submission_id, [{'rubric_id': rubric_id, 'points_earned': points}])
+
+    assert response.status_code == 400
+    assert response.json['grades'][0]['rubric_id'] == rubric_id
+    assert stored_grades(api, submission_id) == []
+
+
+def test_batch_rejects_a_criterion_of_another_assignment(api, client, make, graded_setup):
+    headers, submission_id, _ = graded_setup
+    assignment_id = api.db.session.get(api.Submission, submission_id).assignment_id
+    class_id = api.db.session.get(api.Assignment, assignment_id).class_id
+    _, (other_rubric_id,) = make.assignment(class_id, criteria=(50,))
+
+    response = batch(client, headers, submission_id, [{'rubric_id': other_rubric_id, 'points_earned': 10}])
+
+    assert response.status_code == 400
+    assert stored_grades(api, submission_id) == []
@@ -0,0 +1,81 @@
+"""Unique ID blocks reserved from id_sequences: no number is handed out twice, even across workers."""
+
+import threading
+
+import pytest
+from sqlalchemy import text
+
+
+@pytest.fixture
+def engine(api, client):
+    return api.db.engine
+
+
+def next_value(api, name):
+    with api.db.engine.connect() as conn:
+        return conn.execute(text("SELECT next_value FROM id_sequences WHERE name = :name"), {'name': name}).scalar()
+
+
+def test_concurrent_workers_never_share_an_id(api, engine):
+    # One allocator per simulated worker process, each reserving small blocks at the same time
+    allocators = [api.IdAllocator(block_size=3) for _ in range(4)]
+    results = [[] for _ in allocators]
+    errors = []
+    start = threading.Barrier(len(allocators))
+
+    def work(allocator, out):
+        try:
+            start.wait()
+            for _ in range(10):
+                out += allocator.allocate(engine, 'student', count=2)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=work, args=(allocator, out)) for allocator, out in zip(allocators, results)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    handed_out = [unique_id for out in results for unique_id in out]
+    assert len(handed_out) == 80
+    assert len(set(handed_out)) == 80
+    assert all(unique_id.startswith('s') and len(unique_id) == 9 for unique_id in handed_out)
+
+
+def test_numbers_already_taken_are_skipped(api, make):
+    number = next_value(api, 'instructor')
+    taken = api.db.session.get(api.User, make.user('instructor'))
+    taken.unique_id = f'i{number}'
+    api.db.session.commit()
+
+    allocated = api.IdAllocator(block_size=2).allocate(api.db.engine, 'instructor', count=2)
+
+    assert allocated == [f'i{number + 1}', f'i{number + 2}']
+
+
+def test_an_exhausted_range_raises(api, engine, monkeypatch):
+    import ids
+    monkeypatch.setitem(ids.ID_FORMATS, 'tester', ('x', 10, 12))
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO id_sequences (name, next_value) VALUES ('tester', 10)"))
+    try:
+        allocator = api.IdAllocator(block_size=2)
+        assert allocator.allocate(engine, 'tester', count=3) == ['x10', 'x11', 'x12']
+        with pytest.raises(api.IdSpaceExhausted):
+            allocator.allocate(engine, 'tester')
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM id_sequences WHERE name = 'tester'"))
+
+
+def test_registration_uses_the_allocator(api, client, make):
+    response = client.post('/api/auth/register', json={
+        'email': f'new.{make.prefix}@test', 'password': 'password', 'first_name': 'New', 'last_name': 'Student',
+        'role': 'student'
+    })
+
+    assert response.status_code == 201
+    unique_id = response.json['user']['unique_id']
+    assert unique_id.startswith('s') and int(unique_id[1:]) < next_value(api, 'student')
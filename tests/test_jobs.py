@@ -0,0 +1,225 @@
+"""Background jobs (queue, retries, leases, artifacts) and the principal cache they invalidate."""
+
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def exported_class(api, make):
+    """(instructor headers, class id, assignment id) with one student."""
+    class_id, _ = make.class_(students=1)
+    instructor_id = api.db.session.get(api.Class, class_id).instructor_id
+    assignment_id, _ = make.assignment(class_id)
+    return make.headers(instructor_id), class_id, assignment_id
+
+
+@pytest.fixture
+def queue(api, client, tmp_path):
+    """queue(**options) -> (a JobQueue on the jobs table with no handlers, the engine)."""
+    def create(**options):
+        return api.JobQueue(api.Job.__table__, str(tmp_path), **options), api.db.engine
+    return create
+
+
+def run_jobs(api):
+    # The client shares the test's session, whose last request may have left a transaction open
+    api.db.session.rollback()
+    api.job_queue.work(api.db.engine, on_finished=api.publish_job_event, drain=True)
+
+
+def submit(queue, engine, kind):
+    with engine.begin() as conn:
+        return queue.submit(conn, kind, {})
+
+
+def events_since(api, last_id):
+    return [(event.type, json.loads(event.data)) for event in api.event_log.since(last_id)]
+
+
+def test_async_export_is_queued_then_downloaded(api, client, exported_class):
+    headers, class_id, assignment_id = exported_class
+    last_event = api.event_log.latest_id()
+
+    response = client.get(f'/api/grades/export/{assignment_id}?async=1', headers=headers)
+
+    assert response.status_code == 202
+    location = response.headers['Location']
+    assert response.json['status'] == 'queued'
+    assert client.get(location, headers=headers).headers['Retry-After'] == '2'
+    assert client.get(f'{location}/artifact', headers=headers).status_code == 409
+
+    run_jobs(api)
+
+    job = client.get(location, headers=headers).json
+    assert job['status'] == 'succeeded'
+    assert job['result'] == {'assignment_id': assignment_id}
+    assert ('job.finished', {'job_id': job['job_id'], 'kind': 'export_grades', 'status': 'succeeded',
+                             'class_id': class_id, 'url': location}) in events_since(api, last_event)
+    artifact = client.get(job['artifact']['url'], headers=headers)
+    assert artifact.status_code == 200
+    assert artifact.mimetype == 'text/csv'
+    assert artifact.get_data(as_text=True).startswith('Student ID,')
+
+
+def test_queued_job_can_be_cancelled_once(api, client, exported_class):
+    headers, class_id, _ = exported_class
+    location = client.get(f'/api/grades/export/class/{class_id}', headers={**headers, 'Prefer': 'respond-async'}) \
+        .headers['Location']
+
+    response = client.delete(location, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json['status'] == 'cancelled'
+    assert client.delete(location, headers=headers).status_code == 409
+    run_jobs(api)
+    assert client.get(location, headers=headers).json['status'] == 'cancelled'
+
+
+def test_jobs_are_private_to_their_creator(client, make, exported_class):
+    headers, _, assignment_id = exported_class
+    location = client.get(f'/api/grades/export/{assignment_id}?async=1', headers=headers).headers['Location']
+
+    response = client.get(location, headers=make.headers(make.user('instructor')))
+
+    assert response.status_code == 403
+    assert client.delete(location, headers=headers).status_code == 200
+
+
+def test_failed_attempts_are_retried_with_backoff(queue, make):
+    job_queue, engine = queue(retry_delay=10)
+    kind = f'flaky_{make.prefix}'
+
+    @job_queue.handler(kind, max_attempts=3)
+    def flaky(params, job):
+        raise RuntimeError(f'attempt {job.attempt}')
+
+    job_id = submit(job_queue, engine, kind)
+    for attempt, delay in [(1, 10), (2, 20)]:
+        job = job_queue.claim(engine, 'worker')
+        assert (job.job_id, job.attempts) == (job_id, attempt)
+        started = datetime.utcnow()
+        job = job_queue.execute(engine, job)
+        assert (job.status, job.error) == ('queued', f'RuntimeError: attempt {attempt}')
+        assert timedelta(seconds=delay) <= job.run_after - started < timedelta(seconds=delay + 1)
+        assert job_queue.claim(engine, 'worker') is None
+        with engine.begin() as conn:
+            conn.execute(job_queue.table.update().where(job_queue.table.c.job_id == job_id)
+                         .values(run_after=datetime.utcnow()))
+
+    job = job_queue.execute(engine, job_queue.claim(engine, 'worker'))
+
+    assert (job.status, job.attempts, job.error) == ('failed', 3, 'RuntimeError: attempt 3')
+    assert job.finished_at is not None
+
+
+def test_job_failed_is_not_retried(api, queue, make):
+    job_queue, engine = queue()
+    kind = f'doomed_{make.prefix}'
+
+    @job_queue.handler(kind, max_attempts=3)
+    def doomed(params, job):
+        raise api.JobFailed('Class not found')
+
+    submit(job_queue, engine, kind)
+    job = job_queue.execute(engine, job_queue.claim(engine, 'worker'))
+
+    assert (job.status, job.attempts, job.error) == ('failed', 1, 'Class not found')
+
+
+def test_expired_lease_hands_the_job_to_another_worker(queue, make):
+    job_queue, engine = queue(lease=-1)
+    kind = f'slow_{make.prefix}'
+
+    @job_queue.handler(kind, max_attempts=2)
+    def slow(params, job):
+        return {'attempt': job.attempt}
+
+    job_id = submit(job_queue, engine, kind)
+    lost = job_queue.claim(engine, 'first')
+    taken = job_queue.claim(engine, 'second')
+
+    assert (taken.job_id, taken.attempts) == (job_id, 2)
+    assert job_queue.execute(engine, lost) is None
+    job = job_queue.execute(engine, taken)
+    assert (job.status, json.loads(job.result)) == ('succeeded', {'attempt': 2})
+
+
+def test_sweep_fails_jobs_whose_last_worker_died(queue, make):
+    job_queue, engine = queue(lease=-1)
+    kind = f'dead_{make.prefix}'
+    job_queue.handler(kind, max_attempts=1)(lambda params, job: {})
+
+    job_id = submit(job_queue, engine, kind)
+    assert job_queue.claim(engine, 'dead').job_id == job_id
+    assert job_queue.claim(engine, 'other') is None
+
+    job_queue.sweep(engine)
+
+    with engine.connect() as conn:
+        job = conn.execute(job_queue.table.select().where(job_queue.table.c.job_id == job_id)).first()
+    assert (job.status, job.error) == ('failed', 'Worker stopped before the job finished')
+
+
+def test_sweep_deletes_expired_artifacts(queue, make):
+    job_queue, engine = queue(artifact_ttl=-1)
+    kind = f'export_{make.prefix}'
+
+    @job_queue.handler(kind)
+    def export(params, job):
+        with job.open_artifact('export.csv', 'text/csv') as f:
+            f.write('a,b\n')
+        return {}
+
+    job_id = submit(job_queue, engine, kind)
+    job = job_queue.execute(engine, job_queue.claim(engine, 'worker'))
+    assert (job.artifact_name, job.artifact_size) == ('export.csv', 4)
+    assert os.path.exists(job.artifact_path)
+
+    assert job_queue.sweep(engine) >= 1
+
+    with engine.connect() as conn:
+        job = conn.execute(job_queue.table.select().where(job_queue.table.c.job_id == job_id)).first()
+    assert job.artifact_path is None
+    assert not os.path.exists(os.path.join(job_queue.artifact_dir, str(job_id)))
+
+
+@pytest.fixture
+def new_class(api, client, make):
+    """(instructor id, headers, a function creating another class for them without telling the cache)."""
+    instructor_id = make.user('instructor')
+    headers = make.headers(instructor_id)
+    # Caches the instructor's principal, which has no classes yet
+    assert client.get('/api/health', headers=headers).status_code == 200
+
+    def create():
+        class_obj = api.Class(instructor_id=instructor_id, class_code=f'P{make.prefix}{next(make.serial)}',
+                              class_name='Uncached class')
+        api.db.session.add(class_obj)
+        api.db.session.commit()
+        return class_obj.class_id
+    return instructor_id, headers, create
+
+
+def test_invalidating_a_principal_reloads_its_classes(api, client, new_class):
+    instructor_id, headers, create = new_class
+    class_id = create()
+    assert client.get(f'/api/classes/{class_id}/students', headers=headers).status_code == 403
+
+    api.invalidate_principals([instructor_id])
+
+    assert client.get(f'/api/classes/{class_id}/students', headers=headers).status_code == 200
+
+
+def test_invalidations_from_other_processes_are_applied(api, client, monkeypatch, new_class):
+    _, headers, create = new_class
+    monkeypatch.setattr(api.principal_events, 'interval', 0)
+    class_id = create()
+    assert client.get(f'/api/classes/{class_id}/students', headers=headers).status_code == 403
+
+    # What another process's invalidate_principals leaves in the shared event log
+    api.event_log.publish(api.PRINCIPALS_INVALIDATED, None, None, {'user_ids': None})
+
+    assert client.get(f'/api/classes/{class_id}/students', headers=headers).status_code == 200
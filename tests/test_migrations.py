@@ -0,0 +1,58 @@
+"""Duplicate criterion grades left by older versions and the unique index that replaces them."""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+
+@pytest.fixture
+def duplicate_grades(api, make):
+    """Drops the unique index and leaves two grades for one criterion; (submission id, rubric id)."""
+    class_id, (student_id,) = make.class_(students=1)
+    assignment_id, (rubric_id,) = make.assignment(class_id, criteria=(10,))
+    submission_id = make.submission(assignment_id, student_id)
+    instructor_id = api.db.session.get(api.Class, class_id).instructor_id
+    with api.db.engine.begin() as conn:
+        conn.execute(text("DROP INDEX uq_grades_submission_rubric"))
+    for points in (3, 8):
+        api.db.session.add(api.Grade(submission_id=submission_id, rubric_id=rubric_id,
+                                     points_earned=points, graded_by=instructor_id))
+        api.db.session.commit()
+    yield submission_id, rubric_id
+    with api.db.engine.begin() as conn:
+        conn.execute(text("DELETE FROM grades WHERE submission_id = :id"), {'id': submission_id})
+        api.create_grades_unique_index(conn)
+
+
+def test_compact_grades_keeps_the_latest_grade_and_restores_the_index(api, duplicate_grades):
+    submission_id, rubric_id = duplicate_grades
+    result = api.app.test_cli_runner().invoke(args=['compact-grades'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Removed 1 duplicate' in result.output
+    api.db.session.expire_all()
+    assert [grade.points_earned for grade in api.Grade.query.filter_by(submission_id=submission_id)] == [8]
+    with pytest.raises(IntegrityError, match='(?i)unique|duplicate'):
+        with api.db.engine.begin() as conn:
+            conn.execute(text("INSERT INTO grades (submission_id, rubric_id, points_earned, graded_by) "
+                              "SELECT submission_id, rubric_id, 1, graded_by FROM grades WHERE submission_id = :id"),
+                         {'id': submission_id})
+
+
+def test_compact_grades_is_a_no_op_on_an_upgraded_database(api):
+    for _ in range(2):
+        result = api.app.test_cli_runner().invoke(args=['compact-grades'])
+        assert result.exit_code == 0, result.output
+        assert 'Removed 0 duplicate' in result.output
+
+
+def test_upgrade_refuses_to_delete_duplicate_grades(api, duplicate_grades):
+    import migrations
+    submission_id, _ = duplicate_grades
+
+    with pytest.raises(migrations.MigrationError, match='1 criterion grades.*compact-grades'):
+        with api.db.engine.begin() as conn:
+            migrations._grades_unique_index(conn)
+
+    api.db.session.expire_all()
+    assert sorted(grade.points_earned for grade in api.Grade.query.filter_by(submission_id=submission_id)) == [3, 8]
@@ -0,0 +1,73 @@
+"""The roster, class list and gradebook endpoints run a fixed number of queries however many rows they return."""
+
+import pytest
+
+
+@pytest.fixture
+def make_class(api, make):
+    """make_class(students) -> (instructor id, class id) of a new class with that many enrolled students."""
+    def make_one(students):
+        class_id, _ = make.class_(students=students)
+        return api.db.session.get(api.Class, class_id).instructor_id, class_id
+    return make_one
+
+
+def signed_in(api, client, user_id):
+    """Authorization headers for user_id, with their principal already cached."""
+    headers = {'Authorization': f'Bearer {api.token_signer.issue(user_id)}'}
+    client.get('/api/health', headers=headers)
+    return headers
+
+
+def test_class_students_is_one_query(api, client, make_class, count_queries):
+    counts = []
+    for students in (2, 6):
+        instructor_id, class_id = make_class(students)
+        headers = signed_in(api, client, instructor_id)
+        with count_queries() as queries:
+            response = client.get(f'/api/classes/{class_id}/students', headers=headers)
+        assert response.status_code == 200
+        assert len(response.json) == students
+        counts.append(len(queries))
+
+    assert counts[0] == counts[1] == 1
+
+
+def test_class_list_query_count_is_constant(api, client, make, make_class, count_queries):
+    counts = []
+    for classes in (1, 4):
+        instructor_id, _ = make_class(3)
+        for _ in range(classes - 1):
+            make.class_(instructor_id)
+        headers = signed_in(api, client, instructor_id)
+        with count_queries() as queries:
+            response = client.get(f'/api/classes?instructor_id={instructor_id}', headers=headers)
+        assert response.status_code == 200
+        assert len(response.json) == classes
+        counts.append(len(queries))
+
+    assert counts[0] == counts[1]
+
+
+def test_student_gradebook_query_count_is_constant(api, client, make, count_queries):
+    counts = []
+    for n in (2, 4):
+        class_id, (student_id,) = make.class_(students=1)
+        instructor_id = api.db.session.get(api.Class, class_id).instructor_id
+        graded = []
+        for _ in range(n):
+            assignment_id, rubric_ids = make.assignment(class_id, criteria=(10,) * n)
+            submission_id = make.submission(assignment_id, student_id)
+            graded.append({'submission_id': submission_id,
+                           'grades': [{'rubric_id': rubric_id, 'points_earned': 5} for rubric_id in rubric_ids]})
+        response = client.post('/api/grades/batch', headers=make.headers(instructor_id), json={'submissions': graded})
+        assert response.status_code == 201
+
+        with count_queries() as queries:
+            response = client.get(f'/api/grades/student/{student_id}', headers=make.headers(student_id))
+        assert response.status_code == 200
+        assert len(response.json) == n
+        assert all(len(submission['rubric_grades']) == n for submission in response.json)
+        counts.append(len(queries))
+
+    assert counts[0] == counts[1]
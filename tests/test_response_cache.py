@@ -0,0 +1,73 @@
+"""Cached GET responses: ETags, 304s, and invalidation when a write to a table they read commits."""
+
+import pytest
+
+
+@pytest.fixture(scope='module')
+def cache(api):
+    """A memory response cache in place of the disabled one, for this module's tests."""
+    cache = api.ResponseCache(api.MemoryBackend(64), namespace='tests')
+    with api.app.app_context():
+        cache.track_writes(api.db.engine, api.db.session)
+    previous, api.response_cache = api.response_cache, cache
+    yield cache
+    api.response_cache = previous
+    cache.clear()
+
+
+@pytest.fixture
+def student(api, make):
+    """(student id, headers, instructor headers, class id) for a student enrolled in one class."""
+    class_id, (student_id,) = make.class_(students=1)
+    instructor_id = api.db.session.get(api.Class, class_id).instructor_id
+    return student_id, make.headers(student_id), make.headers(instructor_id), class_id
+
+
+def test_repeat_gets_are_hits_and_matching_etags_get_304(client, cache, student):
+    student_id, headers, _, _ = student
+    path = f'/api/students/{student_id}/classes'
+
+    first = client.get(path, headers=headers)
+    second = client.get(path, headers=headers)
+    conditional = client.get(path, headers=dict(headers, **{'If-None-Match': first.headers['ETag']}))
+
+    assert (first.headers['X-Cache'], second.headers['X-Cache']) == ('MISS', 'HIT')
+    assert second.get_data() == first.get_data()
+    assert second.headers['ETag'] == first.headers['ETag']
+    assert conditional.status_code == 304
+    assert conditional.get_data() == b''
+
+
+def test_a_committed_write_invalidates_the_tables_it_touched(api, client, make, cache, student):
+    student_id, headers, _, _ = student
+    path = f'/api/students/{student_id}/classes'
+    etag = client.get(path, headers=headers).headers['ETag']
+    other_class, _ = make.class_()
+    other_instructor = api.db.session.get(api.Class, other_class).instructor_id
+
+    response = client.post('/api/enrollments', headers=make.headers(other_instructor),
+                           json={'class_id': other_class, 'student_id': student_id})
+    assert response.status_code == 201
+    after = client.get(path, headers=dict(headers, **{'If-None-Match': etag}))
+
+    assert after.status_code == 200
+    assert after.headers['X-Cache'] == 'MISS'
+    assert other_class in {row['class_id'] for row in after.json}
+
+
+def test_writes_to_other_tables_keep_the_entry(client, make, cache, student):
+    _, headers, instructor_headers, class_id = student
+    assignment_id, _ = make.assignment(class_id)
+    path = f'/api/rubrics?assignment_id={assignment_id}'
+    client.get(path, headers=headers)
+
+    client.post('/api/enrollments', headers=instructor_headers, json={'class_id': class_id, 'student_id': make.user()})
+    unchanged = client.get(path, headers=headers)
+    response = client.post('/api/rubrics', headers=instructor_headers,
+                           json={'assignment_id': assignment_id, 'criterion_name': 'Clarity', 'max_points': 10})
+    assert response.status_code == 201
+    changed = client.get(path, headers=headers)
+
+    assert unchanged.headers['X-Cache'] == 'HIT'
+    assert changed.headers['X-Cache'] == 'MISS'
+    assert [row['criterion_name'] for row in changed.json] == ['Clarity']
@@ -0,0 +1,83 @@
+"""Roster imports: validation of the upload and the per-row report."""
+
+import io
+
+import pytest
+
+
+@pytest.fixture
+def roster_setup(api, make):
+    """(instructor headers, class id, enrolled student, three unenrolled students), each a User row."""
+    class_id, (enrolled_id,) = make.class_(students=1)
+    instructor_id = api.db.session.get(api.Class, class_id).instructor_id
+    students = [api.db.session.get(api.User, user_id) for user_id in [enrolled_id] + [make.user() for _ in range(3)]]
+    return make.headers(instructor_id), class_id, students[0], students[1:]
+
+
+def enrolled_ids(api, class_id):
+    return {row.student_id for row in api.Enrollment.query.filter_by(class_id=class_id)}
+
+
+def test_csv_roster_reports_every_row(api, client, roster_setup):
+    headers, class_id, enrolled, (by_email, by_id, _) = roster_setup
+    roster = '\n'.join(['Name,Email', f'A,{by_email.email}', f'B,{enrolled.email}', f'C,{by_email.email}',
+                        'D,nobody@test', '', f'E,{by_id.unique_id}'])
+
+    response = client.post(f'/api/classes/{class_id}/roster', headers=headers, data=roster, content_type='text/csv')
+
+    assert response.status_code == 200
+    assert [(row['row'], row['status']) for row in response.json['rows']] == [
+        (1, 'enrolled'), (2, 'already_enrolled'), (3, 'duplicate'), (4, 'not_found'), (5, 'enrolled')]
+    assert response.json['summary'] == {'enrolled': 2, 'already_enrolled': 1, 'duplicate': 1, 'not_found': 1}
+    assert enrolled_ids(api, class_id) == {enrolled.user_id, by_email.user_id, by_id.user_id}
+
+
+def test_uploaded_file_without_a_header_uses_the_first_column(api, client, roster_setup):
+    headers, class_id, _, (student, _, _) = roster_setup
+    upload = io.BytesIO(f'\ufeff{student.unique_id},ignored\n'.encode())
+
+    response = client.post(f'/api/classes/{class_id}/roster', headers=headers,
+                           data={'file': (upload, 'roster.csv')}, content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    assert response.json['summary']['enrolled'] == 1
+    assert student.user_id in enrolled_ids(api, class_id)
+
+
+def test_instructors_are_not_enrolled(api, client, make, roster_setup):
+    headers, class_id, _, _ = roster_setup
+    instructor = api.db.session.get(api.User, make.user('instructor'))
+
+    response = client.post(f'/api/classes/{class_id}/roster', headers=headers, json={'students': [instructor.email]})
+
+    assert response.json['summary']['not_found'] == 1
+    assert instructor.user_id not in enrolled_ids(api, class_id)
+
+
+@pytest.mark.parametrize('payload', [{'students': []}, {'students': 'abc'}, ['a@test']])
+def test_invalid_json_rosters_are_rejected(client, roster_setup, payload):
+    headers, class_id, _, _ = roster_setup
+
+    response = client.post(f'/api/classes/{class_id}/roster', headers=headers, json=payload)
+
+    assert response.status_code == 400
+
+
+def test_oversized_rosters_are_rejected_before_enrolling(api, client, roster_setup, monkeypatch):
+    headers, class_id, enrolled, students = roster_setup
+    monkeypatch.setattr(api, 'MAX_ROSTER_SIZE', 2)
+
+    response = client.post(f'/api/classes/{class_id}/roster', headers=headers,
+                           json={'students': [student.email for student in students]})
+
+    assert response.status_code == 400
+    assert enrolled_ids(api, class_id) == {enrolled.user_id}
+
+
+def test_students_cannot_import_rosters(client, make, roster_setup):
+    _, class_id, enrolled, _ = roster_setup
+
+    response = client.post(f'/api/classes/{class_id}/roster', headers=make.headers(enrolled.user_id),
+                           json={'students': ['a@test']})
+
+    assert response.status_code == 403
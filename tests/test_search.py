@@ -0,0 +1,109 @@
+"""Full-text search stays inside the class or assignment asked for."""
+
+import pytest
+
+
+@pytest.fixture
+def corpus(api, client, make):
+    """
+    (instructor headers, {name: id}, term) for two assignments of one class and one of another
+    class (another instructor's), each with a submission mentioning term; the first also has
+    criterion feedback mentioning it.
+    """
+    term = f'zq{make.prefix}'
+    class_id, (first_student, second_student) = make.class_(students=2)
+    other_class, (other_student,) = make.class_(students=1)
+    instructor_id = api.db.session.get(api.Class, class_id).instructor_id
+    first, (rubric_id,) = make.assignment(class_id, criteria=(10,))
+    second, _ = make.assignment(class_id)
+    other, _ = make.assignment(other_class)
+    ids = {'class': class_id, 'other class': other_class, 'first': first, 'second': second, 'other': other}
+    for name, assignment_id, student_id in (('first', first, first_student), ('second', second, second_student),
+                                            ('other', other, other_student)):
+        ids[f'{name} submission'] = make.submission(assignment_id, student_id, text=f'An essay about {term} and more')
+    headers = make.headers(instructor_id)
+    response = client.post('/api/grades/batch', headers=headers, json={'submissions': [{
+        'submission_id': ids['first submission'],
+        'grades': [{'rubric_id': rubric_id, 'points_earned': 5, 'feedback': f'Say more about {term}'}]
+    }]})
+    assert response.status_code == 201
+    return headers, ids, term
+
+
+def hits(response):
+    assert response.status_code == 200
+    return sorted((hit['type'], hit['submission_id']) for hit in response.json)
+
+
+def test_class_search_covers_only_that_class(client, corpus):
+    headers, ids, term = corpus
+
+    response = client.get(f'/api/search?q={term}&class_id={ids["class"]}', headers=headers)
+
+    assert hits(response) == sorted([('submission', ids['first submission']), ('submission', ids['second submission']),
+                                     ('feedback', ids['first submission'])])
+    assert all('«' in hit['snippet'] for hit in response.json)
+
+
+def test_assignment_search_covers_only_that_assignment(client, corpus):
+    headers, ids, term = corpus
+
+    response = client.get(f'/api/search?q={term}&assignment_id={ids["second"]}', headers=headers)
+
+    assert hits(response) == [('submission', ids['second submission'])]
+
+
+def test_type_limits_the_sources(client, corpus):
+    headers, ids, term = corpus
+
+    response = client.get(f'/api/search?q={term}&class_id={ids["class"]}&type=feedback', headers=headers)
+
+    assert hits(response) == [('feedback', ids['first submission'])]
+
+
+def test_an_assignment_outside_the_class_finds_nothing(client, corpus):
+    headers, ids, term = corpus
+
+    response = client.get(f'/api/search?q={term}&class_id={ids["class"]}&assignment_id={ids["other"]}',
+                          headers=headers)
+
+    assert hits(response) == []
+
+
+def test_another_instructors_class_is_forbidden(client, corpus):
+    headers, ids, term = corpus
+
+    assert client.get(f'/api/search?q={term}&class_id={ids["other class"]}', headers=headers).status_code == 403
+    assert client.get(f'/api/search?q={term}&assignment_id={ids["other"]}', headers=headers).status_code == 403
+
+
+def test_results_page_with_a_cursor(client, corpus):
+    headers, ids, term = corpus
+    seen = []
+    path = f'/api/search?q={term}&class_id={ids["class"]}&limit=2'
+
+    response = client.get(path, headers=headers)
+    seen += hits(response)
+    response = client.get(f'{path}&cursor={response.headers["X-Next-Cursor"]}', headers=headers)
+    seen += hits(response)
+
+    assert 'X-Next-Cursor' not in response.headers
+    assert len(seen) == len(set(seen)) == 3
+
+
+def test_deleted_submissions_drop_out_of_the_index(api, client, make, corpus):
+    headers, ids, term = corpus
+    student_id = api.db.session.get(api.Submission, ids['second submission']).student_id
+
+    assert client.delete(f'/api/submissions/{ids["second submission"]}',
+                         headers=make.headers(student_id)).status_code == 200
+    response = client.get(f'/api/search?q={term}&assignment_id={ids["second"]}', headers=headers)
+
+    assert hits(response) == []
+
+
+@pytest.mark.parametrize('query', ['q=essay', 'class_id={class_id}', 'q=&class_id={class_id}'])
+def test_a_term_and_a_scope_are_required(client, corpus, query):
+    headers, ids, _ = corpus
+
+    assert client.get(f'/api/search?{query.format(class_id=ids["class"])}', headers=headers).status_code == 400
@@ -0,0 +1,90 @@
+"""Near-duplicate clusters of an assignment's submissions."""
+
+import pytest
+
+ESSAY = ('the industrial revolution changed how people worked and lived as factories drew families from the '
+         'countryside into crowded towns where wages were low hours were long and children often worked beside '
+         'their parents until reformers pressed parliament for the first factory acts')
+OTHER = ('photosynthesis turns light water and carbon dioxide into glucose and oxygen inside the chloroplasts of '
+         'green plants and the energy stored in that sugar feeds almost every food chain on the planet from '
+         'grasses and grazing animals to the predators that hunt them')
+UNRELATED = ('my favourite novel follows a lighthouse keeper who spends a winter alone on a rocky island writing '
+             'letters he never sends to a sister he has not seen since their father died at sea decades ago')
+
+
+def reworded(text, word, replacement):
+    return text.replace(word, replacement, 1)
+
+
+@pytest.fixture
+def submissions(api, client, make):
+    """(instructor headers, assignment id, {label: submission id}) for two near-duplicate pairs and two loners."""
+    texts = {
+        'essay': ESSAY, 'essay copy': reworded(ESSAY, 'crowded', 'packed'),
+        'other': OTHER, 'other copy': reworded(OTHER, 'planet', 'earth'),
+        'unrelated': UNRELATED, 'short': 'see attached file',
+    }
+    class_id, students = make.class_(students=len(texts))
+    instructor_id = api.db.session.get(api.Class, class_id).instructor_id
+    assignment_id, _ = make.assignment(class_id)
+    ids = {}
+    for (label, text), student_id in zip(texts.items(), students):
+        response = client.post('/api/submissions', headers=make.headers(student_id),
+                               json={'assignment_id': assignment_id, 'submission_text': text})
+        ids[label] = response.json['submission_id']
+    return make.headers(instructor_id), assignment_id, ids
+
+
+def clusters(response):
+    return sorted(sorted(s['submission_id'] for s in cluster['submissions']) for cluster in response.json['clusters'])
+
+
+def test_near_duplicates_cluster_and_the_rest_do_not(client, submissions):
+    headers, assignment_id, ids = submissions
+
+    response = client.get(f'/api/assignments/{assignment_id}/similar', headers=headers)
+
+    assert response.status_code == 200
+    assert response.json['indexed'] == 5
+    assert clusters(response) == sorted([sorted([ids['essay'], ids['essay copy']]),
+                                         sorted([ids['other'], ids['other copy']])])
+    for cluster in response.json['clusters']:
+        assert 0.5 <= cluster['similarity'] < 1
+        assert cluster['similarity'] == cluster['pairs'][0]['similarity']
+
+
+def test_identical_texts_have_similarity_one(api, client, make, submissions):
+    headers, assignment_id, ids = submissions
+    class_id = api.db.session.get(api.Assignment, assignment_id).class_id
+    student_id = make.user()
+    api.db.session.add(api.Enrollment(class_id=class_id, student_id=student_id))
+    api.db.session.commit()
+    copy = client.post('/api/submissions', headers=make.headers(student_id),
+                       json={'assignment_id': assignment_id, 'submission_text': ESSAY}).json['submission_id']
+
+    response = client.get(f'/api/assignments/{assignment_id}/similar?threshold=1', headers=headers)
+
+    assert clusters(response) == [sorted([ids['essay'], copy])]
+    assert response.json['clusters'][0]['similarity'] == 1.0
+
+
+@pytest.mark.parametrize('threshold', ['0', '1.5', '-1'])
+def test_thresholds_outside_0_to_1_are_rejected(client, submissions, threshold):
+    headers, assignment_id, _ = submissions
+
+    response = client.get(f'/api/assignments/{assignment_id}/similar?threshold={threshold}', headers=headers)
+
+    assert response.status_code == 400
+
+
+def test_rebuilding_the_index_finds_the_same_clusters(api, client, submissions):
+    headers, assignment_id, _ = submissions
+    before = clusters(client.get(f'/api/assignments/{assignment_id}/similar', headers=headers))
+
+    result = api.app.test_cli_runner().invoke(args=['reindex-similarity', '--assignment-id', str(assignment_id),
+                                                    '--rebuild'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Indexed 5 submissions (1 too short to index)' in result.output
+    api.db.session.expire_all()
+    assert clusters(client.get(f'/api/assignments/{assignment_id}/similar', headers=headers)) == before